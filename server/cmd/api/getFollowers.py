@@ -1,15 +1,32 @@
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
-import time
 import json
-import concurrent.futures
+import functools
 import datetime
-from flask import Flask, jsonify
+import os
+import sys
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
+import redis
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "python"))
+from browser_profiles import apply_profile_options, apply_profile
+from chrome_watchdog import ChromeWatchdog
+from follower_collector import FollowerCollector, account_from_link, collect_batch
+from follower_cache import FollowerCache
+from follower_store import DatabaseUnavailable, latest_counts, count_history, competitor_links
+
 app = Flask(__name__)
 
 CORS(app)
+
+# Tracks the follower browser so its whole process tree is cleaned up when it is replaced
+watchdog = ChromeWatchdog()
+
+# Counts are served from Redis and refreshed in the background, at most one scrape per platform at a time
+redis_client = redis.Redis.from_url("redis://localhost:6379/0", decode_responses=True)
+follower_cache = FollowerCache(redis_client)
+
 def set_up_driver():
     options = Options()
     options.add_argument("--headless")  # Headless mode
@@ -18,140 +35,56 @@ def set_up_driver():
     options.add_argument("--disable-dev-shm-usage")  # Fix memory issues
     options.add_argument("--use-gl=swiftshader")  # Force software rendering
     options.add_argument("--disable-software-rasterizer")  # Avoid software fallback
+    # Tabs load side by side, so keep background tabs running at full speed
+    options.add_argument("--disable-background-timer-throttling")
+    options.add_argument("--disable-backgrounding-occluded-windows")
+    options.add_argument("--disable-renderer-backgrounding")
+    apply_profile_options(options, "minimal")  # Follower counts need no images, fonts or trackers
     driver = webdriver.Chrome(options=options)
-    return driver
+    return apply_profile(driver, "minimal")
 
-#Function to scrape Instagram followers
-def get_instagram_followers(username):
-    driver = set_up_driver()
-    url = f"https://www.instagram.com/{username}/"
-    driver.get(url)
-    time.sleep(2)  # Wait for the page to load
+# Every platform page loads as a tab in one shared Chrome instead of a browser per platform
+collector = FollowerCollector(set_up_driver, watchdog=watchdog)
 
-    try:
-        followers = driver.find_element(By.XPATH, "//div/div/div[2]/div/div/div[1]/div[2]/div/div[1]/section/main/div/header/section/div[2]/ul/li[2]/div/button/span/span").text
-        driver.quit()
-        followers = followers.replace(",", '')
-        return int(followers)
-    except Exception as e:
-        print(f"Error scraping Instagram followers: {e}")
-        driver.quit()
-        return 0
-
-# Function to scrape Facebook followers
-def get_facebook_followers(page_name):
-    driver = set_up_driver()
-    url = f"https://www.facebook.com/{page_name}"
-    driver.get(url)
-    time.sleep(2)  # Wait for the page to load
+# Scraped within this budget or answered from the last known count; override with ?budget=
+FOLLOWERS_BUDGET = 3.0
 
+def _last_known_followers(platform, handle):
+    # Latest scheduled snapshot, for platforms with nothing in the cache that missed the budget.
+    # Without Postgres the platform is simply reported as missing.
     try:
-        # Locate the follower count using XPath
-        followers = driver.find_element(By.XPATH, "//div/div[1]/div/div[3]/div/div/div[1]/div[1]/div/div/div[1]/div[2]/div/div/div/div[3]/div/div/div[2]/span/a[2]").text
-        driver.quit()
-        return parse_number(followers)
-    except Exception as e:
-        print(f"Error scraping Facebook followers: {e}")
-        driver.quit()
-        return 0
-
-
-def get_linkedin_followers(company_name):
-    driver = set_up_driver()
-    url = f"https://www.linkedin.com/company/{company_name}"
-    driver.get(url)
-    time.sleep(2)  # Wait for the page to load
-
-    try:
-        followers = driver.find_element(By.XPATH, "//section[1]/section/div/div[2]/div[1]/h3").text
-        driver.quit()
-        followers = followers.replace("Rockville, MD", '')
-        return parse_number(followers)
-    except Exception as e:
-        print(f"Error scraping LinkedIn followers: {e}")
-        driver.quit()
-        return 0
-
-
-def get_twitch_followers(username):
-    driver = set_up_driver()
-    url = f"https://twitch.tv/{username}/about"
-    driver.get(url)
-    time.sleep(2)  # Wait for the page to load
-
-    try:
-        followers = driver.find_element(By.XPATH, "//div[3]/div/div/div/div[1]/div[2]/div/div/div[2]/div/div[1]/div/div/div/span/div/div/span").text
-        driver.quit()
-        return parse_number(followers)
-    except Exception as e:
-        print(f"Error scraping Twitter followers: {e}")
-        driver.quit()
-        return 0
-
-
-def get_youtube_followers(channel_id):
-    driver = set_up_driver()
-    url = f"https://www.youtube.com/c/{channel_id}"
-    driver.get(url)
-    time.sleep(2)  # Wait for the page to load
-
-    try:
-        subscribers = driver.find_element(By.XPATH, "//yt-page-header-renderer/yt-page-header-view-model/div/div[1]/div/yt-content-metadata-view-model/div[2]/span[1]").text
-        driver.quit()
-        subscribers = subscribers.replace("subscribers", '')
-        return parse_number(subscribers)
-    except Exception as e:
-        print(f"Error scraping YouTube subscribers: {e}")
-        driver.quit()
-        return 0
-
-def parse_number(text):
-    text = text.replace("FOLLOWERS", '')
-    text = text.replace("followers", '')
-    text = text.replace(",", '')
-    if 'K' in text:
-        text = int(text.replace('K',''))
-        return text * 1000
-    else:
-        text = int(text)
-        return text
+        rows = latest_counts(platform, handle)
+    except DatabaseUnavailable:
+        return None
+    if not rows:
+        return None
+    return {"followers": rows[0]["followers"], "fetched_at": rows[0]["captured_at"].isoformat()}
 
 
 @app.route('/followers', methods=['GET'])
 def get_total_followers():
     try:
+        budget = float(request.args.get('budget', FOLLOWERS_BUDGET))
         instagram_username = "dogwood_gaming"
         twitch_username = "dogwoodgaming"
         youtube_channel_id = "DogwoodGaming"
         facebook_page_name = "DogwoodGaming"
         linkedin_company_name = "dogwood-gaming"
 
-        # Create a dictionary of tasks
+        # Create a dictionary of tasks; a failed scrape raises instead of counting as 0
         tasks = {
-            'instagram': (get_instagram_followers, instagram_username),
-            'twitch': (get_twitch_followers, twitch_username),
-            'youtube': (get_youtube_followers, youtube_channel_id),
-            'facebook': (get_facebook_followers, facebook_page_name),
-            'linkedin': (get_linkedin_followers, linkedin_company_name)
+            'instagram': (functools.partial(collector.collect_one, 'instagram'), instagram_username),
+            'twitch': (functools.partial(collector.collect_one, 'twitch'), twitch_username),
+            'youtube': (functools.partial(collector.collect_one, 'youtube'), youtube_channel_id),
+            'facebook': (functools.partial(collector.collect_one, 'facebook'), facebook_page_name),
+            'linkedin': (functools.partial(collector.collect_one, 'linkedin'), linkedin_company_name)
         }
 
-        followers = {}
-        # Use ThreadPoolExecutor for parallel processing
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_platform = {
-                executor.submit(func, arg): platform 
-                for platform, (func, arg) in tasks.items()
-            }
-            
-            for future in concurrent.futures.as_completed(future_to_platform):
-                platform = future_to_platform[future]
-                try:
-                    followers[platform] = future.result()
-                except Exception as e:
-                    print(f"Error getting {platform} followers: {e}")
-                    followers[platform] = 0
-
-        total_followers = sum(followers.values())
+        # Each entry is live, cached or missing; slow platforms finish in the background
+        platforms = follower_cache.get_many(tasks, budget=budget, fallback=_last_known_followers)
+        followers = {platform: entry["followers"] for platform, entry in platforms.items()}
+
+        total_followers = sum(count for count in followers.values() if count is not None)
         
         # Create a response dictionary
         response = {
@@ -159,6 +92,8 @@ def get_total_followers():
             "data": {
                 "total_followers": total_followers,
                 "breakdown": followers,
+                "platforms": platforms,
+                "missing": [platform for platform, entry in platforms.items() if entry["status"] == "missing"],
                 "timestamp": datetime.datetime.now().isoformat()
             }
         }
@@ -172,5 +107,96 @@ def get_total_followers():
         }
         return jsonify(error_response), 500
 
+# Upper bound on (platform, handle) pairs in one batch request
+MAX_BATCH_ACCOUNTS = 1000
+
+@app.route('/followers/batch', methods=['POST'])
+def get_batch_followers():
+    # Body: {"accounts": [{"platform", "handle"}], "links": [profile URLs], "competitors": true}
+    # Streams one JSON line per account as its count arrives
+    body = request.get_json(silent=True) or {}
+    try:
+        accounts = [(account["platform"], account["handle"]) for account in body.get("accounts", [])]
+        links = list(body.get("links", []))
+        if body.get("competitors"):
+            links += competitor_links()
+    except (KeyError, TypeError) as e:
+        return jsonify({"status": "error", "message": f"Invalid accounts: {str(e)}"}), 400
+    except DatabaseUnavailable as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    unsupported = []
+    for link in links:
+        account = account_from_link(link)
+        if account is None:
+            unsupported.append(link)
+        else:
+            accounts.append(account)
+    if len(accounts) > MAX_BATCH_ACCOUNTS:
+        return jsonify({"status": "error", "message": f"At most {MAX_BATCH_ACCOUNTS} accounts per batch"}), 400
+
+    def generate():
+        for link in unsupported:
+            yield json.dumps({"link": link, "followers": None, "status": "error",
+                              "error": "No follower scraper for this link"}) + "\n"
+        for result in collect_batch(collector, accounts, cache=follower_cache):
+            yield json.dumps(result) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+def _serialize_counts(rows):
+    return [
+        dict(row, captured_at=row["captured_at"].isoformat())
+        for row in rows
+    ]
+
+@app.route('/followers/latest', methods=['GET'])
+def get_latest_followers():
+    # Last snapshotted count per account, from Postgres; never scrapes
+    try:
+        rows = latest_counts(request.args.get('platform'), request.args.get('handle'))
+        return jsonify({"status": "success", "data": _serialize_counts(rows)}), 200
+    except DatabaseUnavailable as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/followers/history', methods=['GET'])
+def get_follower_history():
+    # Snapshotted counts for one account, optionally between ISO start/end timestamps
+    platform = request.args.get('platform')
+    handle = request.args.get('handle')
+    if not platform or not handle:
+        return jsonify({"status": "error", "message": "platform and handle are required"}), 400
+    try:
+        start = request.args.get('start')
+        end = request.args.get('end')
+        start = datetime.datetime.fromisoformat(start) if start else None
+        end = datetime.datetime.fromisoformat(end) if end else None
+        limit = int(request.args.get('limit', 1000))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    try:
+        rows = count_history(platform, handle, start, end, limit)
+        return jsonify({
+            "status": "success",
+            "data": {"platform": platform, "handle": handle, "counts": _serialize_counts(rows)}
+        }), 200
+    except DatabaseUnavailable as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/browsers', methods=['GET'])
+def get_browser_metrics():
+    # Live Chrome count and memory for this service
+    return jsonify({"status": "success", "data": watchdog.metrics()}), 200
+
 if __name__ == '__main__':
+    # Reap Chrome left by a previous crash, then keep checking while the service runs
+    watchdog.start()
+    # Launch the follower browser now and keep it warm between requests
+    collector.start()
     app.run(port=8080)
\ No newline at end of file
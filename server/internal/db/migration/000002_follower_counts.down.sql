@@ -0,0 +1,2 @@
+-- Drop follower_counts table
+DROP TABLE IF EXISTS "follower_counts";
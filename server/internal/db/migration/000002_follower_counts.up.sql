@@ -0,0 +1,10 @@
+CREATE TABLE "follower_counts" (
+  "id" BIGSERIAL PRIMARY KEY,
+  "platform" VARCHAR(50) NOT NULL,
+  "handle" VARCHAR(255) NOT NULL,
+  "followers" BIGINT NOT NULL,
+  "captured_at" TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Latest value and time-range reads for one account are index scans
+CREATE INDEX "follower_counts_account_time_idx" ON "follower_counts" ("platform", "handle", "captured_at" DESC);
@@ -21,6 +21,14 @@ type Competitor struct {
 	UpdatedAt       sql.NullTime `json:"updated_at"`
 }
 
+type FollowerCount struct {
+	ID         int64     `json:"id"`
+	Platform   string    `json:"platform"`
+	Handle     string    `json:"handle"`
+	Followers  int64     `json:"followers"`
+	CapturedAt time.Time `json:"captured_at"`
+}
+
 type Group struct {
 	ID          int32          `json:"id"`
 	UserID      int32          `json:"user_id"`
@@ -1,12 +1,19 @@
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
-import time
 import json
 import random
 import concurrent.futures
 import sys
 import datetime
+import os
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from browser_profiles import apply_profile_options, apply_profile
+from chrome_watchdog import ChromeWatchdog
+from follower_collector import FollowerCollector
+
+# Tracks the follower browser so its whole process tree is cleaned up when it is replaced
+watchdog = ChromeWatchdog()
 
 
 def set_up_driver():
@@ -15,119 +22,66 @@ def set_up_driver():
     options.add_argument("--headless")  # Run in headless mode
     options.add_argument("--enable-gpu")
     options.add_argument("--no-sandbox")
+    # Tabs load side by side, so keep background tabs running at full speed
+    options.add_argument("--disable-background-timer-throttling")
+    options.add_argument("--disable-backgrounding-occluded-windows")
+    options.add_argument("--disable-renderer-backgrounding")
+    apply_profile_options(options, "minimal")  # Follower counts need no images, fonts or trackers
     driver = webdriver.Chrome(options=options)
-    return driver
+    return apply_profile(driver, "minimal")
 
-#Function to scrape Instagram followers
-def get_instagram_followers(username):
-    driver = set_up_driver()
-    url = f"https://www.instagram.com/{username}/"
-    driver.get(url)
-    time.sleep(2)  # Wait for the page to load
+# Every platform page loads as a tab in one shared Chrome instead of a browser per platform
+collector = FollowerCollector(set_up_driver, watchdog=watchdog)
 
+def _collect(platform, handle):
     try:
-        followers = driver.find_element(By.XPATH, "//div/div/div[2]/div/div/div[1]/div[2]/div/div[1]/section/main/div/header/section/div[2]/ul/li[2]/div/button/span/span").text
-        driver.quit()
-        followers = followers.replace(",", '')
-        return int(followers)
+        return collector.collect_one(platform, handle)
     except Exception as e:
-        print(f"Error scraping Instagram followers: {e}")
-        driver.quit()
-        return 0
+        print(f"Error scraping {platform} followers: {e}")
+        return None
+
+#Function to scrape Instagram followers
+def get_instagram_followers(username):
+    return _collect('instagram', username)
 
 # Function to scrape Facebook followers
 def get_facebook_followers(page_name):
-    driver = set_up_driver()
-    url = f"https://www.facebook.com/{page_name}"
-    driver.get(url)
-    time.sleep(2)  # Wait for the page to load
-
-    try:
-        # Locate the follower count using XPath
-        followers = driver.find_element(By.XPATH, "//div/div[1]/div/div[3]/div/div/div[1]/div[1]/div/div/div[1]/div[2]/div/div/div/div[3]/div/div/div[2]/span/a[2]").text
-        driver.quit()
-        return parse_number(followers)
-    except Exception as e:
-        print(f"Error scraping Facebook followers: {e}")
-        driver.quit()
-        return 0
-
+    return _collect('facebook', page_name)
 
 def get_linkedin_followers(company_name):
-    driver = set_up_driver()
-    url = f"https://www.linkedin.com/company/{company_name}"
-    driver.get(url)
-    time.sleep(2)  # Wait for the page to load
-
-    try:
-        followers = driver.find_element(By.XPATH, "//section[1]/section/div/div[2]/div[1]/h3").text
-        driver.quit()
-        followers = followers.replace("Rockville, MD", '')
-        return parse_number(followers)
-    except Exception as e:
-        print(f"Error scraping LinkedIn followers: {e}")
-        driver.quit()
-        return 0
-
+    return _collect('linkedin', company_name)
 
 def get_twitch_followers(username):
-    driver = set_up_driver()
-    url = f"https://twitch.tv/{username}/about"
-    driver.get(url)
-    time.sleep(2)  # Wait for the page to load
+    return _collect('twitch', username)
 
-    try:
-        followers = driver.find_element(By.XPATH, "//div[3]/div/div/div/div[1]/div[2]/div/div/div[2]/div/div[1]/div/div/div/span/div/div/span").text
-        driver.quit()
-        return parse_number(followers)
-    except Exception as e:
-        print(f"Error scraping Twitter followers: {e}")
-        driver.quit()
-        return 0
+def get_youtube_followers(channel_id):
+    return _collect('youtube', channel_id)
 
 
-def get_youtube_followers(channel_id):
-    driver = set_up_driver()
-    url = f"https://www.youtube.com/c/{channel_id}"
-    driver.get(url)
-    time.sleep(2)  # Wait for the page to load
+# Scraper for each platform, called with the account's handle on that platform
+FOLLOWER_SCRAPERS = {
+    'instagram': get_instagram_followers,
+    'twitch': get_twitch_followers,
+    'youtube': get_youtube_followers,
+    'facebook': get_facebook_followers,
+    'linkedin': get_linkedin_followers
+}
 
-    try:
-        subscribers = driver.find_element(By.XPATH, "//yt-page-header-renderer/yt-page-header-view-model/div/div[1]/div/yt-content-metadata-view-model/div[2]/span[1]").text
-        driver.quit()
-        subscribers = subscribers.replace("subscribers", '')
-        return parse_number(subscribers)
-    except Exception as e:
-        print(f"Error scraping YouTube subscribers: {e}")
-        driver.quit()
-        return 0
-
-def parse_number(text):
-    text = text.replace("FOLLOWERS", '')
-    text = text.replace("followers", '')
-    text = text.replace(",", '')
-    if 'K' in text:
-        text = int(text.replace('K',''))
-        return text * 1000
-    else:
-        text = int(text)
-        return text
+# Our own accounts, tracked by totalFollowers() and the scheduled snapshots
+ACCOUNTS = {
+    'instagram': "dogwood_gaming",
+    'twitch': "dogwoodgaming",
+    'youtube': "DogwoodGaming",
+    'facebook': "DogwoodGaming",
+    'linkedin': "dogwood-gaming"
+}
 
 
 def totalFollowers():
-    instagram_username = "dogwood_gaming"
-    twitch_username = "dogwoodgaming"
-    youtube_channel_id = "DogwoodGaming"
-    facebook_page_name = "DogwoodGaming"
-    linkedin_company_name = "dogwood-gaming"
-
     # Create a dictionary of tasks
     tasks = {
-        'instagram': (get_instagram_followers, instagram_username),
-        'twitch': (get_twitch_followers, twitch_username),
-        'youtube': (get_youtube_followers, youtube_channel_id),
-        'facebook': (get_facebook_followers, facebook_page_name),
-        'linkedin': (get_linkedin_followers, linkedin_company_name)
+        platform: (FOLLOWER_SCRAPERS[platform], handle)
+        for platform, handle in ACCOUNTS.items()
     }
 
     followers = {}
@@ -144,9 +98,10 @@ def totalFollowers():
                 followers[platform] = future.result()
             except Exception as e:
                 print(f"Error getting {platform} followers: {e}")
-                followers[platform] = 0
+                followers[platform] = None
 
-    total_followers = sum(followers.values())
+    # Failed platforms are left out rather than counted as 0
+    total_followers = sum(count for count in followers.values() if count is not None)
     
     # Create a response dictionary with both total and breakdown
     response = {
@@ -158,8 +113,10 @@ def totalFollowers():
 
 # Main function
 if __name__ == "__main__":
+    watchdog.reap_orphans()
     # start_time = time.time()
     result = totalFollowers()
+    collector.close()
     # print(result)  # Print the JSON string
     # end_time = time.time()
     # total_time = end_time - start_time
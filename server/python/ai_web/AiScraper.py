@@ -2,19 +2,41 @@ from selenium import webdriver
 import shutil
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 import time
 import pandas as pd
-import re
 import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
 import sys
 import logging
 import random
 from urllib.parse import urlparse
 import os
+from contextlib import contextmanager
+
+# Shared scraper modules live one level up in server/python
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from http_cache import HttpCache
+from driver_pool import DriverPool
+from crawl_scheduler import CrawlScheduler
+from circuit_breaker import CircuitOpenError
+from result_writer import ResultWriter
+from near_dup import NearDuplicateIndex
+from crawl_index import CrawlIndex
+from snapshot_store import SnapshotStore
+from text_clean import clean_text, clean_texts
+from static_fetch import StaticFetcher, FetchModeStore
+from feed_discovery import FeedDiscovery
+from extraction import (
+    LISTING_CASCADES, ARTICLE_CASCADES,
+    parse_html, looks_js_gated, extract_listing, extract_article,
+    extract_listing_in_browser, extract_article_in_browser
+)
+from selector_stats import SelectorStats
+from crawl_metrics import CrawlMetrics
+from readiness import wait_until_ready
+from browser_profiles import apply_profile_options, apply_profile
+from chrome_watchdog import ChromeWatchdog
 
 # Set up logging
 logging.basicConfig(
@@ -27,6 +49,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# User agents rotated between drivers and between pool leases to avoid detection
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36"
+]
+
+# Scraping drivers skip images, media, fonts, trackers and embeds (see browser_profiles.PROFILES)
+BROWSER_PROFILE = "text"
+
 def set_up_driver():
     options = Options()
     options.add_argument("--headless")
@@ -34,53 +66,57 @@ def set_up_driver():
     options.add_argument("--no-sandbox")
     options.add_argument("--log-level=3")
     # Add user agent to avoid detection
-    user_agents = [
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15",
-        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36"
-    ]
-    options.add_argument(f"--user-agent={random.choice(user_agents)}")
+    options.add_argument(f"--user-agent={random.choice(USER_AGENTS)}")
     options.add_argument("--window-size=1920,1080")
     options.add_argument("--disable-notifications")
+    apply_profile_options(options, BROWSER_PROFILE)
 
     driver = webdriver.Chrome(options=options)
-    return driver
-
-def clean_text(text):
-    if not text:
-        return ""
-        x
-    share_texts = [
-        "Click to share on Facebook",
-        "Click to share on Reddit", 
-        "Click to share on LinkedIn",
-        "Click to share on WhatsApp",
-        "Click to share on Threads",
-        "Click to share on Bluesky",
-        "Click to share on Mastodon", 
-        "Click to share on Telegram",
-        "Click to share on Pinterest",
-        "Click to share on X",
-        "Click to print",
-        "Click to email a link to a friend",
-        "Terms of Use",
-        "Get Started - It's Free",
-        "Cloudflare",
-    ]
-    
-    for share_text in share_texts:
-        text = text.replace(share_text, "")
-    
-    # Remove URLs
-    text = re.sub(r'http\S+', '', text)
-    # Remove extra whitespace
-    text = ' '.join(text.split())
-    # Remove non-breaking spaces
-    text = text.replace('\xa0', ' ')
-    # Remove common ads and cookie messages
-    text = re.sub(r'(accept all cookies|cookie policy|privacy policy|accept cookies|we use cookies)', '', text, flags=re.IGNORECASE)
-    
-    return text
+    return apply_profile(driver, BROWSER_PROFILE)
+
+# Tracks every Chrome we start, retires bloated ones and reaps ones left by crashed runs
+chrome_watchdog = ChromeWatchdog(max_pages=100, max_rss_mb=1536)
+
+# Drivers are shared by all scraping workers instead of being started per URL
+driver_pool = DriverPool(set_up_driver, max_size=5, user_agents=USER_AGENTS, watchdog=chrome_watchdog)
+
+# Politeness budget enforced by the crawl scheduler for every host
+PER_HOST_CONCURRENCY = 2
+PER_HOST_RATE = 0.5  # pages per second
+PER_HOST_BURST = 2
+POLITENESS_JITTER = (0.0, 1.0)  # random extra seconds before each request
+
+# Failed pages are retried with backoff; a host's circuit opens after this many failures in a row
+MAX_RETRIES = 2
+FAILURE_THRESHOLD = 3
+
+# Upper bound on waiting for a browser page to settle before extracting anyway
+READY_TIMEOUT = 10
+
+# Pages fetched within this window are re-extracted from the HTTP cache without a request
+HTTP_CACHE_MAX_AGE = 6 * 60 * 60
+
+# Static pages are fetched over plain HTTP; Chrome is only used when that fails
+static_fetcher = StaticFetcher(user_agents=USER_AGENTS, cache=HttpCache(), max_age=HTTP_CACHE_MAX_AGE)
+fetch_modes = FetchModeStore("output/fetch_modes.json")
+
+# RSS/Atom feeds and sitemaps found per listing source; sources without one are rendered
+feed_discovery = FeedDiscovery(static_fetcher, "output/feeds.json")
+
+# Articles fetched recently are replayed from here instead of being scraped again
+crawl_index = CrawlIndex("output/crawl_index.db")
+
+# Raw HTML of every fetched page, kept so reextract.py can replay extraction offline
+snapshot_store = SnapshotStore("output/snapshots")
+
+# Which selector won each cascade per domain, used to skip selectors that never match there
+selector_stats = SelectorStats("output/selector_stats.json")
+
+# Per-page phase timings and crawl counters: served to Prometheus and summarised at the end.
+# Only main() traces them to JSON lines, so importers such as reextract.py and Celery workers do not.
+page_metrics = CrawlMetrics()
+METRICS_PORT = 9108
+TRACE_PATH = "output/crawl_trace.jsonl"
 
 def is_valid_url(url):
     try:
@@ -89,367 +125,357 @@ def is_valid_url(url):
     except ValueError:
         return False
 
-def scrape_website(url, category, max_retries=2):
-    retries = 0
-    while retries <= max_retries:
-        driver = set_up_driver()
-        try:
-            logger.info(f"Scraping {category} website: {url}")
-            driver.get(url)
-            
-            # Wait for page to load
-            try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
-                )
-            except TimeoutException:
-                logger.warning(f"Timeout waiting for page to load: {url}")
-            
-            # Random pause to avoid detection
-            time.sleep(random.uniform(2, 5))
-            
-            scraped_data = []
-            
-            # Define article selectors by priority
-            article_selectors = [
-                "article", 
-                "div.post", 
-                "div.entry", 
-                ".blog-post", 
-                ".news-item",
-                ".card",
-                "section.content div",
-                ".article"
-            ]
-            
-            # Try to find articles using selectors
-            articles = []
-            for selector in article_selectors:
-                articles = driver.find_elements(By.CSS_SELECTOR, selector)
-                if articles:
-                    break
-            
-            # If articles found, extract data
-            if articles:
-                for article in articles:
-                    try:
-                        # Title selectors in priority order
-                        title_selectors = [
-                            "h1 a", "h2 a", "h3 a", "h2.entry-title a", 
-                            "h2", "h3", "h1", ".title a", ".title"
-                        ]
-                        
-                        title_element = None
-                        title = ""
-                        link = ""
-                        
-                        # Find title element
-                        for selector in title_selectors:
-                            try:
-                                title_elements = article.find_elements(By.CSS_SELECTOR, selector)
-                                if title_elements:
-                                    title_element = title_elements[0]
-                                    title = title_element.text.strip()
-                                    if title_element.tag_name == 'a':
-                                        link = title_element.get_attribute("href")
-                                    break
-                            except StaleElementReferenceException:
-                                # Retry with fresh reference
-                                driver.refresh()
-                                articles = driver.find_elements(By.CSS_SELECTOR, article_selectors[0])
-                                continue
-                        
-                        # If no link found in title, try to find it separately
-                        if not link and title:
-                            for link_selector in ["a", ".readmore", ".more-link", ".read-more"]:
-                                link_elements = article.find_elements(By.CSS_SELECTOR, link_selector)
-                                if link_elements:
-                                    link = link_elements[0].get_attribute("href")
-                                    break
-                        
-                        # Extract date if available
-                        date = ""
-                        date_selectors = [
-                            ".date", ".post-date", ".entry-date", "time", ".meta time", 
-                            "span.time", ".published"
-                        ]
-                        for date_selector in date_selectors:
-                            date_elements = article.find_elements(By.CSS_SELECTOR, date_selector)
-                            if date_elements:
-                                date = date_elements[0].text.strip()
-                                break
-                        
-                        # Extract excerpt if available
-                        excerpt = ""
-                        excerpt_selectors = [
-                            ".excerpt", ".entry-summary", ".summary", "p", ".description"
-                        ]
-                        for excerpt_selector in excerpt_selectors:
-                            excerpt_elements = article.find_elements(By.CSS_SELECTOR, excerpt_selector)
-                            if excerpt_elements:
-                                excerpt = excerpt_elements[0].text.strip()
-                                break
-                        
-                        if title and is_valid_url(link):
-                            scraped_data.append({
-                                "title": clean_text(title),
-                                "link": link,
-                                "date": date,
-                                "excerpt": clean_text(excerpt),
-                                "category": category,
-                                "source_url": url
-                            })
-                    except Exception as e:
-                        logger.error(f"Error extracting article content: {str(e)}")
-            else:
-                # Fallback for pages without clear article structure
-                logger.info(f"No articles found, using fallback method for {url}")
-                
-                # Try to find all links that might be articles
-                links = driver.find_elements(By.TAG_NAME, "a")
-                for link_element in links:
-                    try:
-                        href = link_element.get_attribute("href")
-                        link_text = link_element.text.strip()
-                        
-                        # Skip if link is empty, not valid, or too short to be a title
-                        if not href or not link_text or len(link_text) < 10 or not is_valid_url(href):
-                            continue
-                            
-                        # Skip navigation links, social media, etc.
-                        skip_patterns = ['login', 'register', 'contact', 'about', 'facebook', 'twitter', 'instagram']
-                        if any(pattern in href.lower() for pattern in skip_patterns):
-                            continue
-                            
-                        # Get parent to check if it looks like an article container
-                        parent = link_element.find_element(By.XPATH, "./..")
-                        parent_class = parent.get_attribute("class") or ""
-                        
-                        if any(term in parent_class.lower() for term in ['post', 'article', 'entry', 'card', 'content']):
-                            scraped_data.append({
-                                "title": clean_text(link_text),
-                                "link": href,
-                                "date": "",
-                                "excerpt": "",
-                                "category": category,
-                                "source_url": url
-                            })
-                    except Exception as e:
-                        continue
-                        
-                # If still no data, just get the main content and title
-                if not scraped_data:
-                    try:
-                        title = driver.title
-                        body_text = driver.find_element(By.TAG_NAME, "body").text
-                        scraped_data.append({
-                            "title": clean_text(title),
-                            "link": url,
-                            "date": "",
-                            "excerpt": clean_text(body_text[:300] + "..."),
-                            "category": category,
-                            "source_url": url
-                        })
-                    except Exception as e:
-                        logger.error(f"Fallback extraction failed for {url}: {str(e)}")
-            
-            # Success - return scraped data
+@contextmanager
+def leased_driver(url):
+    """Lease a pooled driver for ``url``, timing the wait for it as the acquire phase"""
+    with page_metrics.span("acquire", url):
+        driver = driver_pool.acquire()
+    try:
+        yield driver
+    finally:
+        driver_pool.release(driver)
+
+def record_selectors(url, cascades, hits):
+    """Feed one page's selector hits to the per-domain stats and the crawl counters"""
+    selector_stats.record(urlparse(url).netloc, cascades, hits)
+    for field, counts in hits.items():
+        for selector, count in counts.items():
+            page_metrics.count("selector", count, field=field, selector=selector or "none")
+
+def build_listing_records(items, category, url):
+    """Turn raw listing items from either fetch path into cleaned records"""
+    items = [item for item in items if item["title"] and is_valid_url(item["link"])]
+    with page_metrics.span("clean", url):
+        titles = clean_texts([item["title"] for item in items])
+        excerpts = clean_texts([item["excerpt"] for item in items])
+    return [
+        {
+            "title": title,
+            "link": item["link"],
+            "date": item["date"],
+            "excerpt": excerpt,
+            "category": category,
+            "source_url": url
+        }
+        for item, title, excerpt in zip(items, titles, excerpts)
+    ]
+
+def build_article_result(paragraphs, metadata, url=None):
+    """Clean raw paragraph texts into an article result, or None if nothing is left"""
+    # Skip very short paragraphs, then clean the rest in one batch
+    paragraphs = [text.strip() for text in paragraphs if text and len(text.strip()) > 10]
+    with page_metrics.span("clean", url):
+        paragraph_texts = [text for text in clean_texts(paragraphs) if text]
+
+    if not paragraph_texts:
+        return None
+    content = " ".join(paragraph_texts)
+    return {
+        "content": content,
+        "metadata": metadata,
+        "word_count": len(content.split()),
+        "paragraph_count": len(paragraph_texts)
+    }
+
+def fetch_static_page(url, kind, **context):
+    """Fetch and parse a page over HTTP. Returns None if it needs a browser."""
+    with page_metrics.span("fetch", url, kind=kind):
+        html = static_fetcher.fetch(url)
+    if not html:
+        return None
+    page_metrics.count("bytes", len(html.encode("utf-8")), path="static")
+    save_snapshot(url, html, kind, fetch_path="static", **context)
+    try:
+        with page_metrics.span("parse", url):
+            tree = parse_html(html, url)
+    except Exception as e:
+        logger.warning(f"Could not parse static page {url}: {str(e)}")
+        return None
+    if looks_js_gated(html, tree):
+        logger.info(f"Static page looks JavaScript-gated: {url}")
+        return None
+    return tree
+
+def save_snapshot(url, html, kind, **context):
+    try:
+        snapshot_store.save(url, html, kind, **context)
+    except Exception as e:
+        logger.warning(f"Could not save snapshot of {url}: {str(e)}")
+
+def scrape_website_static(url, category):
+    tree = fetch_static_page(url, "listing", category=category)
+    if tree is None:
+        return []
+    cascades = selector_stats.cascades(urlparse(url).netloc, LISTING_CASCADES)
+    hits = {}
+    with page_metrics.span("extract", url):
+        items = extract_listing(tree, cascades, hits)
+    record_selectors(url, cascades, hits)
+    return build_listing_records(items, category, url)
+
+def scrape_paragraphs_static(url):
+    tree = fetch_static_page(url, "article")
+    if tree is None:
+        return None
+    cascades = selector_stats.cascades(urlparse(url).netloc, ARTICLE_CASCADES)
+    hits = {}
+    with page_metrics.span("extract", url):
+        raw = extract_article(tree, cascades, hits)
+    record_selectors(url, cascades, hits)
+    return build_article_result(raw["paragraphs"], raw["metadata"], url)
+
+def scrape_website(url, category, backfill=None):
+    """List a source's articles from its feed or sitemap, else scrape the page over HTTP or Chrome"""
+    with page_metrics.span("feed", url):
+        items = feed_discovery.list_articles(url, backfill=backfill)
+    if items is not None:
+        logger.info(f"Listed {len(items)} {category} articles from feed/sitemap: {url}")
+        page_metrics.count("feed_listing")
+        return build_listing_records(items, category, url)
+
+    domain = urlparse(url).netloc
+    if fetch_modes.get(domain, "listing") != "browser":
+        logger.info(f"Scraping {category} website over HTTP: {url}")
+        scraped_data = scrape_website_static(url, category)
+        if scraped_data:
+            fetch_modes.set(domain, "listing", "static")
             return scraped_data
-            
-        except Exception as e:
-            logger.error(f"Error scraping {url}: {str(e)}")
-            retries += 1
-            time.sleep(random.uniform(5, 10))  # Exponential backoff
-        finally:
-            driver.quit()
-    
-    # If we get here, all retries failed
-    logger.error(f"All retries failed for {url}")
-    return []
-
-def scrape_paragraphs(url, max_retries=2):
-    retries = 0
-    while retries <= max_retries:
-        driver = set_up_driver()
-        try:
-            logger.info(f"Scraping content from {url}")
+        page_metrics.count("fallback", kind="listing", reason="browser")
+
+    scraped_data = scrape_website_browser(url, category)
+    if scraped_data:
+        fetch_modes.set(domain, "listing", "browser")
+    return scraped_data
+
+def scrape_website_browser(url, category):
+    """Scrape a listing page in Chrome. Errors are raised so the scheduler can back off and retry"""
+    with leased_driver(url) as driver:
+        logger.info(f"Scraping {category} website: {url}")
+        with page_metrics.span("navigate", url, kind="listing"):
             driver.get(url)
-            
-            # Wait for page to load
+        
+        # Wait until the DOM, network and article count settle; pacing is left to the scheduler
+        cascades = selector_stats.cascades(urlparse(url).netloc, LISTING_CASCADES)
+        with page_metrics.span("ready", url):
+            ready = wait_until_ready(driver, ", ".join(cascades["article"]), timeout=READY_TIMEOUT)
+        if not ready:
+            logger.warning(f"Timeout waiting for page to settle: {url}")
+            page_metrics.count("ready_timeout")
+        
+        # Run the whole selector cascade in the page with one script call
+        hits = {}
+        with page_metrics.span("extract", url):
+            items, used_fallback = extract_listing_in_browser(driver, cascades, hits)
+        record_selectors(url, cascades, hits)
+        html = driver.page_source
+        page_metrics.count("bytes", len(html.encode("utf-8")), path="browser")
+        save_snapshot(url, html, "listing", fetch_path="browser", category=category)
+        if used_fallback:
+            logger.info(f"No articles found, using fallback method for {url}")
+            page_metrics.count("fallback", kind="listing", reason="anchors")
+        scraped_data = build_listing_records(items, category, url)
+        
+        # If still no data, just get the main content and title
+        if used_fallback and not scraped_data:
             try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
-                )
-            except TimeoutException:
-                logger.warning(f"Timeout waiting for page to load: {url}")
-            
-            # Random pause to avoid detection
-            time.sleep(random.uniform(2, 5))
-            
-            # Try to find the article content container first
-            content_selectors = [
-                "article .entry-content", 
-                "article .content",
-                "div.entry-content",
-                "div.post-content",
-                "div.article-content",
-                "div.content",
-                "article",
-                "main",
-                ".main-content"
-            ]
-            
-            content_container = None
-            for selector in content_selectors:
-                containers = driver.find_elements(By.CSS_SELECTOR, selector)
-                if containers:
-                    content_container = containers[0]
-                    break
-            
-            # Try multiple selectors for paragraphs
-            paragraph_selectors = [
-                "p", 
-                "div.paragraph",
-                ".text"
-            ]
-            
-            paragraphs = []
-            if content_container:
-                # Search within content container
-                for selector in paragraph_selectors:
-                    paragraphs = content_container.find_elements(By.CSS_SELECTOR, selector)
-                    if paragraphs:
-                        break
-            else:
-                # Search in entire document
-                for selector in paragraph_selectors:
-                    paragraphs = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if paragraphs:
-                        break
-            
-            # Extract and clean paragraph texts
-            paragraph_texts = []
-            for p in paragraphs:
-                text = p.text.strip()
-                if text and len(text) > 10:  # Skip very short paragraphs
-                    cleaned_text = clean_text(text)
-                    if cleaned_text:
-                        paragraph_texts.append(cleaned_text)
-            
-            # Extract metadata if available
-            metadata = {}
+                title = driver.title
+                body_text = driver.find_element(By.TAG_NAME, "body").text
+                scraped_data.append({
+                    "title": clean_text(title),
+                    "link": url,
+                    "date": "",
+                    "excerpt": clean_text(body_text[:300] + "..."),
+                    "category": category,
+                    "source_url": url
+                })
+                page_metrics.count("fallback", kind="listing", reason="body_text")
+            except Exception as e:
+                logger.error(f"Fallback extraction failed for {url}: {str(e)}")
+        
+        return scraped_data
+
+def scrape_paragraphs(url):
+    """Scrape an article over HTTP, falling back to Chrome when needed"""
+    domain = urlparse(url).netloc
+    if fetch_modes.get(domain, "article") != "browser":
+        logger.info(f"Scraping content over HTTP from {url}")
+        result = scrape_paragraphs_static(url)
+        if result:
+            fetch_modes.set(domain, "article", "static")
+            return result
+        page_metrics.count("fallback", kind="article", reason="browser")
+
+    result = scrape_paragraphs_browser(url)
+    if result["content"]:
+        fetch_modes.set(domain, "article", "browser")
+    return result
+
+def scrape_paragraphs_browser(url, max_reloads=1):
+    """Scrape an article in Chrome, reloading when no content rendered.
+
+    Errors are raised so the scheduler can back off and retry.
+    """
+    with leased_driver(url) as driver:
+        for attempt in range(max_reloads + 1):
+            logger.info(f"Scraping content from {url}")
+            if attempt:
+                page_metrics.count("reload")
+            with page_metrics.span("navigate", url, kind="article", attempt=attempt):
+                driver.get(url)
             
-            # Try to get author
-            author_selectors = [".author", ".byline", ".entry-author", "meta[name='author']"]
-            for selector in author_selectors:
-                try:
-                    author_elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if author_elements:
-                        metadata["author"] = author_elements[0].text.strip()
-                        break
-                except Exception:
-                    pass
+            # Wait until the DOM, network and paragraph count settle; pacing is left to the scheduler
+            cascades = selector_stats.cascades(urlparse(url).netloc, ARTICLE_CASCADES)
+            with page_metrics.span("ready", url):
+                ready = wait_until_ready(driver, ", ".join(cascades["paragraph"]), timeout=READY_TIMEOUT)
+            if not ready:
+                logger.warning(f"Timeout waiting for page to settle: {url}")
+                page_metrics.count("ready_timeout")
             
-            # Try to get published date
-            date_selectors = [
-                ".date", ".published", ".post-date", ".entry-date", 
-                "time", "meta[property='article:published_time']"
-            ]
-            for selector in date_selectors:
-                try:
-                    date_elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if date_elements:
-                        if selector.startswith("meta"):
-                            metadata["published_date"] = date_elements[0].get_attribute("content")
-                        else:
-                            metadata["published_date"] = date_elements[0].text.strip()
-                        break
-                except Exception:
-                    pass
+            # Run the content, paragraph and metadata cascades in one script call
+            hits = {}
+            with page_metrics.span("extract", url):
+                raw = extract_article_in_browser(driver, cascades, hits)
+            record_selectors(url, cascades, hits)
+            html = driver.page_source
+            page_metrics.count("bytes", len(html.encode("utf-8")), path="browser")
+            save_snapshot(url, html, "article", fetch_path="browser")
+            metadata = raw["metadata"]
             
-            # If we found content, return it
-            if paragraph_texts:
-                content = " ".join(paragraph_texts)
-                return {
-                    "content": content,
-                    "metadata": metadata,
-                    "word_count": len(content.split()),
-                    "paragraph_count": len(paragraph_texts)
-                }
-            elif retries < max_retries:
-                # If no content found, retry
-                retries += 1
-                time.sleep(random.uniform(3, 7))
-                continue
-            else:
-                # Last resort: get all text from body
-                body_text = driver.find_element(By.TAG_NAME, "body").text
-                cleaned_text = clean_text(body_text)
-                return {
-                    "content": cleaned_text,
-                    "metadata": metadata,
-                    "word_count": len(cleaned_text.split()),
-                    "paragraph_count": 1
-                }
-                
-        except Exception as e:
-            logger.error(f"Error scraping paragraphs from {url}: {str(e)}")
-            retries += 1
-            time.sleep(random.uniform(5, 10))
-        finally:
-            driver.quit()
-    
-    return {
-        "content": "",
-        "metadata": {},
-        "word_count": 0,
-        "paragraph_count": 0
+            # If we found content, return it; otherwise reload, which waits for readiness again
+            result = build_article_result(raw["paragraphs"], metadata, url)
+            if result:
+                return result
+        
+        # Last resort: get all text from body
+        page_metrics.count("fallback", kind="article", reason="body_text")
+        body_text = driver.find_element(By.TAG_NAME, "body").text
+        with page_metrics.span("clean", url):
+            cleaned_text = clean_text(body_text)
+        return {
+            "content": cleaned_text,
+            "metadata": metadata,
+            "word_count": len(cleaned_text.split()),
+            "paragraph_count": 1
+        }
+
+def new_scheduler(max_workers):
+    return CrawlScheduler(
+        max_concurrency=max_workers,
+        per_host_concurrency=PER_HOST_CONCURRENCY,
+        per_host_rate=PER_HOST_RATE,
+        per_host_burst=PER_HOST_BURST,
+        jitter=POLITENESS_JITTER,
+        max_retries=MAX_RETRIES,
+        failure_threshold=FAILURE_THRESHOLD,
+        metrics=page_metrics
+    )
+
+def build_article_data(item, result):
+    article_data = {
+        "title": '' if pd.isna(item.get('title')) else item['title'],
+        "link": item['link'],
+        "category": item['category'],
+        "content": result["content"],
     }
+    
+    # Add metadata if available
+    for key, value in result["metadata"].items():
+        if value:
+            article_data[key] = value
+    return article_data
 
-def scrape_links(csv_file, max_workers=5):
-    data = pd.read_csv(csv_file)
-    detailed_data = []
+async def scrape_article(scheduler, item, writer=None):
+    """Scrape one article link and write it out as soon as it is done"""
+    # Skip articles that were fetched recently and have not come due again
+    cached = crawl_index.fresh_record(item['link'])
+    if cached:
+        cached["category"] = item['category']
+        if writer:
+            with page_metrics.span("persist", item['link']):
+                writer.add_article(cached)
+        page_metrics.count("index_hit")
+        logger.info(f"Using indexed copy of recently fetched article: {item['link']}")
+        return cached
     
+    try:
+        result = await scheduler.run(scrape_paragraphs, item['link'])
+    except CircuitOpenError as e:
+        logger.warning(f"Skipping {item['link']}, host still failing: {str(e)}")
+        crawl_index.record_failure(item['link'], status="deferred")
+        return None
+    except Exception as e:
+        logger.error(f"Error processing {item['link']}: {str(e)}")
+        crawl_index.record_failure(item['link'])
+        return None
     
-    # Use ThreadPoolExecutor for parallel processing
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all tasks
-        future_to_row = {executor.submit(scrape_paragraphs, row['link']): row for _, row in data.iterrows()}
-        
-        # Process results as they complete
-        for future in as_completed(future_to_row):
-            row = future_to_row[future]
-            try:
-                result = future.result()
-                if result["content"]:
-                    article_data = {
-                        "title": '' if pd.isna(row['title']) else row['title'],
-                        "category": row['category'],
-                        "content": result["content"],
-                    }
-                    
-                    # Add metadata if available
-                    for key, value in result["metadata"].items():
-                        if value:
-                            article_data[key] = value
-                    
-                    detailed_data.append(article_data)
-                    
-                    
-                    logger.info(f"Successfully scraped article: {row['title']}")
-                else:
-                    logger.warning(f"No content found for: {row['link']}")
-            except Exception as e:
-                logger.error(f"Error processing {row['link']}: {str(e)}")
+    if not result["content"]:
+        logger.warning(f"No content found for: {item['link']}")
+        crawl_index.record_failure(item['link'], status="empty")
+        return None
     
-    return detailed_data
+    article_data = build_article_data(item, result)
+    with page_metrics.span("persist", item['link']):
+        if not crawl_index.record_success(item['link'], article_data):
+            logger.info(f"Article unchanged since last fetch: {item['link']}")
+        if writer:
+            writer.add_article(article_data)
+    logger.info(f"Successfully scraped article: {item['title']}")
+    return article_data
 
-def save_to_json(data, filename):
-    """Save data to JSON with proper encoding"""
-    import json
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    logger.info(f"Data saved to {filename}")
+async def crawl_async(websites, max_workers, writer):
+    """Scrape listing pages and stream every new link straight to the article stage"""
+    scheduler = new_scheduler(max_workers)
+    reporter = asyncio.create_task(scheduler.report_stats())
+    seen_links = {}
+    article_tasks = []
+    source_tasks = []
+    
+    async def mark_listed(url, listed_at, tasks):
+        # Move the feed's listing mark only once every article made it, so failed
+        # or deferred ones are listed again next run
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        if all(result is not None and not isinstance(result, BaseException) for result in results):
+            feed_discovery.mark_listed(url, listed_at)
+    
+    async def scrape_listing(url, category):
+        listed_at = time.time()
+        try:
+            items = await scheduler.run(scrape_website, url, category)
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping {url}, host still failing: {str(e)}")
+            return
+        except Exception as e:
+            logger.error(f"Error processing scraping result for {url}: {str(e)}")
+            return
+        
+        with page_metrics.span("persist", url):
+            for item in items:
+                writer.add_listing(item)
+        new_links = 0
+        tasks = []
+        for item in items:
+            # Queue each unique link right away instead of waiting for every listing page
+            task = seen_links.get(item["link"])
+            if task is None:
+                task = seen_links[item["link"]] = asyncio.create_task(scrape_article(scheduler, item, writer))
+                article_tasks.append(task)
+                new_links += 1
+            tasks.append(task)
+        source_tasks.append(asyncio.create_task(mark_listed(url, listed_at, tasks)))
+        logger.info(f"Found {len(items)} articles on {url} ({new_links} new)")
+    
+    try:
+        await asyncio.gather(*(
+            scrape_listing(url, category)
+            for category, urls in websites.items()
+            for url in urls
+        ))
+        logger.info(f"Listing pages done. Queued {len(seen_links)} unique article links.")
+        await asyncio.gather(*article_tasks)
+        await asyncio.gather(*source_tasks)
+    finally:
+        reporter.cancel()
+        scheduler.close()
 
 def main():
     start_time = time.time()
@@ -473,6 +499,11 @@ def main():
         ]
     }
     
+    # Prometheus scrape port for the crawl metrics; set metrics_port to null in the config to turn it off
+    metrics_port = METRICS_PORT
+    # Parquet datasets are written when pyarrow is installed; set parquet to true or false in the config to force it
+    parquet = None
+    
     # Add ability to read websites from a config file
     try:
         if os.path.exists("scraper_config.json"):
@@ -482,71 +513,62 @@ def main():
                 if "websites" in config:
                     websites = config["websites"]
                     logger.info("Loaded websites from configuration file")
+                if "http_cache_max_age" in config:
+                    static_fetcher.max_age = config["http_cache_max_age"]
+                if "backfill" in config:
+                    # Follow feed pagination and read whole sitemaps instead of only new entries
+                    feed_discovery.backfill = config["backfill"]
+                if "metrics_port" in config:
+                    metrics_port = config["metrics_port"]
+                if "parquet" in config:
+                    parquet = config["parquet"]
     except Exception as e:
         logger.error(f"Error loading configuration: {str(e)}")
     
-    all_data = []
+    # Global cap on pages in flight; per-host limits keep each site polite
+    max_workers = 5
     
-    # Limit concurrency to avoid getting blocked
-    max_workers = 3
+    # Clean up browsers left by earlier runs and keep checking while this one is going
+    chrome_watchdog.start()
+    page_metrics.start_trace(TRACE_PATH)
+    if metrics_port:
+        page_metrics.serve(metrics_port)
     
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = []
-        for category, urls in websites.items():
-            for url in urls:
-                futures.append(executor.submit(scrape_website, url, category))
-        
-        # Process results as they complete
-        for future in as_completed(futures):
-            try:
-                result = future.result()
-                if result:
-                    all_data.extend(result)
-            except Exception as e:
-                logger.error(f"Error processing scraping result: {str(e)}")
+    # Results are written as they arrive rather than in one batch at the end
+    writer = ResultWriter("output", dedup=NearDuplicateIndex(), parquet=parquet)
+    try:
+        asyncio.run(crawl_async(websites, max_workers, writer))
+    finally:
+        writer.close()
+        # Shut down the shared browsers even if the crawl failed
+        driver_pool.close()
+        chrome_watchdog.stop()
+        page_metrics.close()
     
-    # Save initial data
-    if all_data:
-        df = pd.DataFrame(all_data)
-        df.to_csv("output/scraped_data.csv", index=False)
-        save_to_json(all_data, "output/scraped_data.json")
-        logger.info(f"Initial scraping completed. Found {len(all_data)} articles.")
-        
-        # Remove duplicates based on link
-        df = df.drop_duplicates(subset=['link'])
-        logger.info(f"After removing duplicates: {len(df)} articles")
-        
-        # Scrape detailed content
-        detailed_data = scrape_links("output/scraped_data.csv", max_workers=max_workers)
-        
-        if detailed_data:
-            detailed_df = pd.DataFrame(detailed_data)
-            
-            # Save complete dataset
-            detailed_df.to_csv("output/detailed_data.csv", index=False)
-            save_to_json(detailed_data, "output/detailed_data.json")
-            
-            # Split and save category-specific files
-            for category in detailed_df["category"].unique():
-                category_df = detailed_df[detailed_df["category"] == category]
-                category_df.to_csv(f"output/{category}_data.csv", index=False)
-                save_to_json(category_df.to_dict('records'), f"output/{category}_data.json")
-                logger.info(f"Saved {len(category_df)} articles for category: {category}")
-        else:
-            logger.warning("No detailed content was successfully scraped")
-    else:
+    if not writer.listings.count:
         logger.warning("Initial scraping did not find any articles")
+    elif not writer.articles.count:
+        logger.warning("No detailed content was successfully scraped")
+    else:
+        logger.info(f"Scraped {writer.articles.count} articles from {writer.listings.count} listing entries "
+                    f"({writer.duplicates} near-duplicates dropped).")
+        for category, count in writer.category_counts.items():
+            logger.info(f"Saved {count} articles for category: {category}")
+    
+    metrics = chrome_watchdog.metrics()
+    logger.info(f"Chrome: {metrics['recycled']} browsers recycled, {metrics['reaped']} orphaned processes reaped")
+    selector_stats.save()
+    logger.info(f"Where the crawl time went (trace in {TRACE_PATH}):\n{page_metrics.summary()}")
     
     end_time = time.time()
     total_time = end_time - start_time
     logger.info(f"Total Execution Time: {datetime.timedelta(seconds=int(total_time))}")
     
     logger.info("\nFiles created:")
-    logger.info("1. output/scraped_data.csv/.json - Initial scraping results")
-    logger.info("2. output/detailed_data.csv/.json - Complete dataset with full content")
+    logger.info("1. output/scraped_data.jsonl/.parquet - Initial scraping results")
+    logger.info("2. output/detailed_data.jsonl/.parquet/.json - Complete dataset with full content")
     for category in websites.keys():
-        logger.info(f"3. output/{category}_data.csv/.json - Data from {category} websites")
-    logger.info("4. Individual article text files in scraped_articles/ directory")
+        logger.info(f"3. output/detailed_data.parquet/category={category}/ - Data from {category} websites")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,439 @@
+import argparse
+import datetime
+import gzip
+import importlib
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import numpy as np
+import psutil
+
+logger = logging.getLogger(__name__)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_fixtures")
+
+_WORDS = (
+    "indie game developer marketing steam wishlist launch trailer community discord "
+    "publisher demo festival review press kit pixel art roguelike platformer narrative "
+    "studio funding kickstarter update patch release console port players feedback "
+    "design level mechanic soundtrack budget audience social media creator stream"
+).split()
+
+# Listing markup varies per synthetic site so the selector cascades get exercised
+_LISTING_TEMPLATES = [
+    '<article><h2><a href="{link}">{title}</a></h2><time>{date}</time><p>{excerpt}</p></article>',
+    '<div class="post"><h3><a href="{link}">{title}</a></h3><span class="date">{date}</span>'
+    '<div class="excerpt">{excerpt}</div></div>',
+    '<div class="card"><a class="read-more" href="{link}"><h2 class="title">{title}</h2></a>'
+    '<span class="published">{date}</span><p class="summary">{excerpt}</p></div>',
+]
+
+_BOILERPLATE = "Click to share on Facebook Click to share on X We use cookies to improve your experience."
+
+
+class SyntheticSite:
+    """Deterministic listing, article and feed pages generated from a seed."""
+
+    def __init__(self, sites=6, articles_per_site=20, paragraphs=8, duplicate_every=7, seed=7):
+        self.sites = sites
+        self.articles_per_site = articles_per_site
+        self.paragraphs = paragraphs
+        self.duplicate_every = duplicate_every
+        self.seed = seed
+
+    def _rng(self, *key):
+        return random.Random(f"{self.seed}:" + ":".join(map(str, key)))
+
+    def _sentence(self, rng, words=14):
+        text = " ".join(rng.choice(_WORDS) for _ in range(words))
+        return text[0].upper() + text[1:] + "."
+
+    def _title(self, site, article):
+        rng = self._rng("title", site, article)
+        return " ".join(rng.choice(_WORDS) for _ in range(6)).title()
+
+    def _date(self, site, article):
+        day = datetime.date(2024, 1, 1) + datetime.timedelta(days=(site * 31 + article) % 365)
+        return day.isoformat()
+
+    def listing_urls(self, base):
+        """Websites dict for the synthetic sources, as AiScraper.main() expects."""
+        urls = [f"{base}/synthetic/site{site}/" for site in range(self.sites)]
+        urls.append(f"{base}/synthetic/feedblog/")
+        return {"normal": urls[::2], "marketing": urls[1::2]}
+
+    def article_urls(self, base):
+        return [
+            f"{base}/synthetic/site{site}/post-{article}/"
+            for site in range(self.sites) for article in range(self.articles_per_site)
+        ]
+
+    def render(self, path, base):
+        """Return ``(status, content_type, body)`` for a path under /synthetic/."""
+        parts = [part for part in path.split("/") if part]
+        if parts == ["feedblog"]:
+            return 200, "text/html", self._feed_home(base)
+        if parts == ["feedblog", "feed"]:
+            return 200, "application/rss+xml", self._feed(base)
+        if len(parts) == 1 and parts[0].startswith("site"):
+            return 200, "text/html", self._listing(int(parts[0][4:]), base)
+        if len(parts) == 2 and parts[0].startswith("site") and parts[1].startswith("post-"):
+            return 200, "text/html", self._article(int(parts[0][4:]), int(parts[1][5:]))
+        if len(parts) == 2 and parts[0] == "feedblog" and parts[1].startswith("post-"):
+            return 200, "text/html", self._article(self.sites, int(parts[1][5:]))
+        return 404, "text/html", "<html><body>Not found</body></html>"
+
+    def _listing(self, site, base):
+        template = _LISTING_TEMPLATES[site % len(_LISTING_TEMPLATES)]
+        rng = self._rng("listing", site)
+        entries = "\n".join(
+            template.format(
+                link=f"{base}/synthetic/site{site}/post-{article}/",
+                title=self._title(site, article),
+                date=self._date(site, article),
+                excerpt=self._sentence(rng),
+            )
+            for article in range(self.articles_per_site)
+        )
+        nav = "".join(f'<a href="{base}/synthetic/site{site}/{name}/">{name}</a> ' for name in ("about", "contact", "login"))
+        return (f"<html><head><title>Site {site}</title></head><body><nav>{nav}</nav>"
+                f"<main>{entries}</main><footer>{_BOILERPLATE}</footer></body></html>")
+
+    def _article(self, site, article):
+        # Every few articles repeat another site's text to exercise near-duplicate dropping
+        source = (0, article) if self.duplicate_every and article % self.duplicate_every == 0 else (site, article)
+        rng = self._rng("article", *source)
+        paragraphs = "".join(
+            f"<p>{' '.join(self._sentence(rng) for _ in range(4))}</p>" for _ in range(self.paragraphs)
+        )
+        return (f"<html><head><title>{self._title(site, article)}</title>"
+                f"<meta name='author' content='Author {site}'></head><body>"
+                f"<article><h1>{self._title(site, article)}</h1><time>{self._date(site, article)}</time>"
+                f"<div class='entry-content'>{paragraphs}<p>{_BOILERPLATE}</p></div></article></body></html>")
+
+    def _feed_home(self, base):
+        return (f'<html><head><link rel="alternate" type="application/rss+xml" '
+                f'href="{base}/synthetic/feedblog/feed/"></head><body><p>Feed blog</p></body></html>')
+
+    def _feed(self, base):
+        items = "".join(
+            f"<item><title>{self._title(self.sites, article)}</title>"
+            f"<link>{base}/synthetic/feedblog/post-{article}/</link>"
+            f"<pubDate>{self._date(self.sites, article)}</pubDate>"
+            f"<description>{self._sentence(self._rng('feed', article))}</description></item>"
+            for article in range(self.articles_per_site)
+        )
+        return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Feed blog</title>{items}</channel></rss>'
+
+
+class RecordedSite:
+    """Pages recorded from the live sources, served from ``FIXTURES_DIR/recorded``.
+
+    ``record()`` copies the latest snapshot of every page in a SnapshotStore
+    into the fixtures directory together with a manifest, so the real
+    sources in ``AiScraper.main()`` can be replayed offline. Absolute links
+    to the recorded origins are rewritten to the local server when served.
+    """
+
+    def __init__(self, directory=os.path.join(FIXTURES_DIR, "recorded")):
+        self.directory = directory
+        self.pages = {}
+        manifest = os.path.join(directory, "manifest.json")
+        if os.path.exists(manifest):
+            with open(manifest, 'r', encoding='utf-8') as f:
+                self.pages = json.load(f)
+        self.origins = sorted({self._origin(url) for url in self.pages}, key=len, reverse=True)
+
+    @staticmethod
+    def _origin(url):
+        parts = urlparse(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def local_url(self, url, base):
+        parts = urlparse(url)
+        return f"{base}/recorded/{parts.netloc}{parts.path or '/'}" + (f"?{parts.query}" if parts.query else "")
+
+    def record(self, snapshot_dir):
+        from snapshot_store import SnapshotStore
+        store = SnapshotStore(snapshot_dir)
+        os.makedirs(self.directory, exist_ok=True)
+        for entry in store.entries():
+            name = f"{entry['hash']}.html.gz"
+            with gzip.open(os.path.join(self.directory, name), 'wt', encoding='utf-8') as f:
+                f.write(store.load(entry["hash"]))
+            self.pages[entry["url"]] = {"file": name, "kind": entry["kind"], "category": entry.get("category", "")}
+        with open(os.path.join(self.directory, "manifest.json"), 'w', encoding='utf-8') as f:
+            json.dump(self.pages, f, indent=2)
+        return len(self.pages)
+
+    def listing_urls(self, base):
+        websites = {}
+        for url, page in self.pages.items():
+            if page["kind"] == "listing":
+                websites.setdefault(page["category"] or "normal", []).append(self.local_url(url, base))
+        return websites
+
+    def article_urls(self, base):
+        return [self.local_url(url, base) for url, page in self.pages.items() if page["kind"] == "article"]
+
+    def render(self, path, base):
+        host, _, rest = path.lstrip("/").partition("/")
+        for scheme in ("https", "http"):
+            for candidate in (f"{scheme}://{host}/{rest}", f"{scheme}://{host}/{rest}".rstrip("/")):
+                page = self.pages.get(candidate)
+                if page:
+                    with gzip.open(os.path.join(self.directory, page["file"]), 'rt', encoding='utf-8') as f:
+                        html = f.read()
+                    for origin in self.origins:
+                        html = html.replace(origin, f"{base}/recorded/{urlparse(origin).netloc}")
+                    return 200, "text/html", html
+        return 404, "text/html", "<html><body>Not found</body></html>"
+
+
+class FixtureServer:
+    """Local HTTP server for the synthetic and recorded fixture sites."""
+
+    def __init__(self, synthetic, recorded=None, latency_ms=0, port=0):
+        self.synthetic = synthetic
+        self.recorded = recorded
+        self.latency = latency_ms / 1000
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                path = urlparse(self.path).path
+                if path.startswith("/synthetic/"):
+                    status, content_type, body = server.synthetic.render(path[len("/synthetic"):], server.base)
+                elif path.startswith("/recorded/") and server.recorded:
+                    status, content_type, body = server.recorded.render(path[len("/recorded"):], server.base)
+                else:
+                    status, content_type, body = 404, "text/html", "<html><body>Not found</body></html>"
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.base = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class ResourceSampler:
+    """Samples peak RSS of this process tree (including Chrome) and the pool's browser count."""
+
+    def __init__(self, driver_pool=None, interval=0.2):
+        self.driver_pool = driver_pool
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_browsers = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        process = psutil.Process()
+        rss = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except psutil.Error:
+                pass
+        self.peak_rss = max(self.peak_rss, rss)
+        if self.driver_pool is not None:
+            self.peak_browsers = max(self.peak_browsers, self.driver_pool.size())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def _summary(name, pages, seconds, latencies, sampler, **extra):
+    latencies = np.array(latencies or [0.0])
+    return {
+        "name": name,
+        "pages": pages,
+        "seconds": round(seconds, 3),
+        "pages_per_second": round(pages / seconds, 2) if seconds else 0.0,
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 1),
+        "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 1),
+        "peak_rss_mb": round(sampler.peak_rss / (1024 * 1024), 1),
+        "peak_browsers": sampler.peak_browsers,
+        **extra,
+    }
+
+
+def _timed(func, latencies):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+    return wrapper
+
+
+def run_benchmarks(websites, article_urls, workdir, scenarios=("listing", "article", "pipeline")):
+    """Run the scraper scenarios against fixture URLs from inside ``workdir``."""
+    os.chdir(workdir)
+    # Imported here so every output path the scraper opens lands in the scratch directory
+    scraper = importlib.import_module("AiScraper")
+    from http_cache import HttpCache
+
+    # One local host serves every fixture, so lift the politeness budget
+    scraper.PER_HOST_CONCURRENCY = 64
+    scraper.PER_HOST_RATE = 1e6
+    scraper.PER_HOST_BURST = 1e6
+    scraper.POLITENESS_JITTER = None
+
+    def fresh_cache(name):
+        scraper.static_fetcher.cache = HttpCache(os.path.join(workdir, "http_cache", name))
+
+    results = []
+    listing_urls = [(url, category) for category, urls in websites.items() for url in urls]
+
+    if "listing" in scenarios:
+        fresh_cache("listing")
+        latencies, found = [], 0
+        with ResourceSampler(scraper.driver_pool) as sampler:
+            start = time.perf_counter()
+            for url, category in listing_urls:
+                found += len(_timed(scraper.scrape_website, latencies)(url, category))
+            elapsed = time.perf_counter() - start
+        results.append(_summary("scrape_website", len(listing_urls), elapsed, latencies, sampler, items=found))
+
+    if "article" in scenarios:
+        fresh_cache("article")
+        latencies, empty = [], 0
+        with ResourceSampler(scraper.driver_pool) as sampler:
+            start = time.perf_counter()
+            for url in article_urls:
+                if not _timed(scraper.scrape_paragraphs, latencies)(url)["content"]:
+                    empty += 1
+            elapsed = time.perf_counter() - start
+        results.append(_summary("scrape_paragraphs", len(article_urls), elapsed, latencies, sampler, empty=empty))
+
+    if "pipeline" in scenarios:
+        fresh_cache("pipeline")
+        # No Prometheus port: the run must not depend on 9108 being free
+        with open("scraper_config.json", 'w') as f:
+            json.dump({"websites": websites, "metrics_port": None}, f)
+        latencies = []
+        original = scraper.scrape_website, scraper.scrape_paragraphs
+        scraper.scrape_website = _timed(original[0], latencies)
+        scraper.scrape_paragraphs = _timed(original[1], latencies)
+        # main() starts the Chrome watchdog; keep it off the developer's other browsers
+        scraper.chrome_watchdog.reap_orphans = lambda: 0
+        try:
+            with ResourceSampler(scraper.driver_pool) as sampler:
+                start = time.perf_counter()
+                scraper.main()
+                elapsed = time.perf_counter() - start
+        finally:
+            scraper.scrape_website, scraper.scrape_paragraphs = original
+            del scraper.chrome_watchdog.reap_orphans
+        with open(os.path.join("output", "detailed_data.jsonl"), 'r', encoding='utf-8') as f:
+            articles = sum(1 for _ in f)
+        results.append(_summary("main", len(latencies), elapsed, latencies, sampler, articles=articles))
+
+    scraper.driver_pool.close()
+    return results
+
+
+def print_results(results, baseline=None):
+    by_name = {result["name"]: result for result in baseline or []}
+    columns = ["pages", "pages_per_second", "p50_ms", "p95_ms", "peak_rss_mb", "peak_browsers"]
+    print(f"{'scenario':<18}" + "".join(f"{column:>18}" for column in columns))
+    for result in results:
+        row = f"{result['name']:<18}"
+        for column in columns:
+            cell = f"{result[column]}"
+            before = by_name.get(result["name"], {}).get(column)
+            if before:
+                cell += f" ({(result[column] - before) / before * 100:+.0f}%)"
+            row += f"{cell:>18}"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against a local fixture site")
+    parser.add_argument("--sites", type=int, default=6, help="Synthetic listing sites")
+    parser.add_argument("--articles", type=int, default=20, help="Articles per synthetic site")
+    parser.add_argument("--latency-ms", type=float, default=20, help="Simulated server latency per request")
+    parser.add_argument("--recorded", action="store_true", help="Use recorded pages instead of synthetic ones")
+    parser.add_argument("--record", metavar="SNAPSHOT_DIR", help="Copy snapshots into the recorded fixtures and exit")
+    parser.add_argument("--scenario", action="append", choices=["listing", "article", "pipeline"],
+                        help="Scenario to run (repeatable, default all)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    if args.record:
+        print(f"Recorded {RecordedSite().record(args.record)} pages into {FIXTURES_DIR}")
+        return
+
+    logging.basicConfig(level=logging.WARNING)
+    synthetic = SyntheticSite(sites=args.sites, articles_per_site=args.articles)
+    recorded = RecordedSite()
+    if args.recorded and not recorded.pages:
+        parser.error(f"No recorded pages in {recorded.directory}; run with --record first")
+
+    workdir = tempfile.mkdtemp(prefix="scraper-bench-")
+    cwd = os.getcwd()
+    try:
+        with FixtureServer(synthetic, recorded, latency_ms=args.latency_ms) as server:
+            site = recorded if args.recorded else synthetic
+            results = run_benchmarks(
+                site.listing_urls(server.base), site.article_urls(server.base), workdir,
+                scenarios=args.scenario or ("listing", "article", "pipeline")
+            )
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import email.utils
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TransientFetchError(Exception):
+    """A host failed in a way worth retrying later (down, overloaded or rate limiting).
+
+    ``retry_after`` carries the delay in seconds the host asked for, if any.
+    """
+
+    def __init__(self, url, reason, retry_after=None):
+        super().__init__(f"{reason} for {url}")
+        self.url = url
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    """Raised when a host's circuit has stayed open too long to keep waiting."""
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def backoff_delay(attempt, base=2.0, cap=300.0, retry_after=None):
+    """Exponential backoff with full jitter, never shorter than ``retry_after``."""
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for a single host.
+
+    The circuit opens after ``failure_threshold`` failures in a row and stays
+    open for ``reset_timeout`` seconds (or longer if the host sent
+    Retry-After). After that one caller is let through as a half-open probe:
+    success closes the circuit, failure reopens it with the timeout doubled up
+    to ``max_reset_timeout``. Once the circuit has been open for more than
+    ``give_up_after`` seconds without a success, ``wait_time()`` raises
+    ``CircuitOpenError`` so queued work for the host is dropped rather than
+    waiting forever.
+
+    Not thread-safe; meant to be used from the scheduler's event loop.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=3, reset_timeout=30, max_reset_timeout=600, give_up_after=900):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.give_up_after = give_up_after
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.opened_at = None
+        self.retry_at = 0.0
+        self._probing = False
+
+    def wait_time(self):
+        """Seconds a caller should wait before trying this host; 0 means go ahead.
+
+        A caller that gets 0 while the circuit is half-open becomes the probe
+        and must report back through ``record_success`` or ``record_failure``.
+        """
+        if self.state == self.CLOSED:
+            return 0.0
+        now = time.monotonic()
+        if now - self.opened_at > self.give_up_after:
+            raise CircuitOpenError(f"circuit open for {int(now - self.opened_at)}s")
+        if now < self.retry_at:
+            return self.retry_at - now
+        if self._probing:
+            # Someone else is probing; check back shortly
+            return min(self.reset_timeout, 5.0)
+        self.state = self.HALF_OPEN
+        self._probing = True
+        return 0.0
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit closed after {self.trips} trip(s)")
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self, retry_after=None):
+        """Count a failure. Returns True if this failure opened (or reopened) the circuit."""
+        self.failures += 1
+        if self.state == self.CLOSED and self.failures < self.failure_threshold:
+            return False
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            # A request that started before the circuit opened; only honour Retry-After
+            if retry_after is not None:
+                self.retry_at = max(self.retry_at, now + retry_after)
+            return False
+        if self.state == self.CLOSED:
+            self.opened_at = now
+        self.trips += 1
+        timeout = min(self.max_reset_timeout, self.reset_timeout * (2 ** (self.trips - 1)))
+        if retry_after is not None:
+            timeout = max(timeout, retry_after)
+        self.state = self.OPEN
+        self.retry_at = now + random.uniform(timeout, timeout * 1.2)
+        self._probing = False
+        return True
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src"}
+
+DAY = 24 * 60 * 60
+
+
+def canonicalize_url(url):
+    """Normalize a URL so the same article always maps to the same key."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not (scheme == "http" and parts.port == 80) and not (scheme == "https" and parts.port == 443):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class CrawlIndex:
+    """Persistent SQLite index of article fetches, keyed by canonical URL.
+
+    Each row keeps the last fetch time, a hash of the extracted content, the
+    extraction status and the last good record. Articles that were fetched
+    successfully within their revisit interval are served from the index
+    instead of being scraped again. The interval starts at ``revisit_days``
+    and doubles (up to ``max_revisit_days``) every time a refetch finds the
+    content unchanged. Failures are always retried.
+    """
+
+    def __init__(self, path, revisit_days=7, max_revisit_days=60):
+        self.path = path
+        self.revisit_seconds = revisit_days * DAY
+        self.max_revisit_seconds = max_revisit_days * DAY
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    url TEXT PRIMARY KEY,
+                    last_fetched REAL NOT NULL,
+                    content_hash TEXT,
+                    status TEXT NOT NULL,
+                    revisit_after REAL NOT NULL,
+                    failures INTEGER NOT NULL DEFAULT 0,
+                    record TEXT
+                )
+            """)
+            self._conn.commit()
+        return self._conn
+
+    def fresh_record(self, url):
+        """Return the stored record if the article does not need fetching yet."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT last_fetched, status, revisit_after, record FROM articles WHERE url = ?",
+                (canonicalize_url(url),)
+            ).fetchone()
+        if not row:
+            return None
+        last_fetched, status, revisit_after, record = row
+        if status != "ok" or not record or time.time() - last_fetched > revisit_after:
+            return None
+        return json.loads(record)
+
+    def record_success(self, url, record):
+        """Store a successful extraction. Returns True if the content changed."""
+        key = canonicalize_url(url)
+        new_hash = content_hash(record["content"])
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT content_hash, revisit_after FROM articles WHERE url = ? AND status = 'ok'",
+                (key,)
+            ).fetchone()
+            changed = not row or row[0] != new_hash
+            # Back off on pages that keep coming back unchanged
+            revisit_after = self.revisit_seconds if changed else min(row[1] * 2, self.max_revisit_seconds)
+            conn.execute("""
+                INSERT OR REPLACE INTO articles
+                    (url, last_fetched, content_hash, status, revisit_after, failures, record)
+                VALUES (?, ?, ?, 'ok', ?, 0, ?)
+            """, (key, time.time(), new_hash, revisit_after, json.dumps(record, ensure_ascii=False)))
+            conn.commit()
+        return changed
+
+    def record_failure(self, url, status="error"):
+        """Mark an article as failed so the next run retries it."""
+        key = canonicalize_url(url)
+        with self._lock:
+            conn = self._connection()
+            conn.execute("""
+                INSERT INTO articles (url, last_fetched, status, revisit_after, failures)
+                VALUES (?, ?, ?, 0, 1)
+                ON CONFLICT(url) DO UPDATE SET
+                    last_fetched = excluded.last_fetched,
+                    status = excluded.status,
+                    revisit_after = 0,
+                    failures = articles.failures + 1
+            """, (key, time.time(), status))
+            conn.commit()
+
+    def stats(self):
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT status, COUNT(*) FROM articles GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,205 @@
+import collections
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+class CrawlMetrics:
+    """Per-URL phase spans and event counters for a crawl.
+
+    ``span()`` times one phase of one page (acquire, navigate, ready,
+    extract, clean, persist, ...). Each finished span is folded into
+    per-phase and per-domain totals and, once ``start_trace()`` was called,
+    written to a JSON-lines trace.
+    ``count()`` bumps labelled counters such as retries, fallbacks,
+    selector hits or bytes fetched. ``prometheus()`` renders everything in
+    the Prometheus text format, ``serve()`` exposes it over HTTP and
+    ``summary()`` formats the slowest phases and domains for the log.
+    """
+
+    def __init__(self, max_samples=10000):
+        self.trace_path = None
+        self.max_samples = max_samples
+        self.run_id = uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        self._trace = None
+        self._phase_samples = collections.defaultdict(lambda: collections.deque(maxlen=max_samples))
+        self._phase_totals = collections.defaultdict(lambda: [0, 0.0])
+        self._counters = collections.Counter()
+        self._server = None
+
+    @contextmanager
+    def span(self, phase, url=None, **fields):
+        """Time the body of a ``with`` block as one phase of ``url``."""
+        start = time.perf_counter()
+        error = None
+        try:
+            yield fields
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self.record(phase, time.perf_counter() - start, url, error=error, **fields)
+
+    def record(self, phase, seconds, url=None, error=None, **fields):
+        """Record a phase duration measured elsewhere."""
+        domain = urlparse(url).netloc if url else ""
+        entry = {"ts": time.time(), "run": self.run_id, "phase": phase, "url": url,
+                 "domain": domain, "ms": round(seconds * 1000, 2)}
+        if error:
+            entry["error"] = error
+        entry.update(fields)
+        with self._lock:
+            self._phase_samples[phase].append(seconds)
+            totals = self._phase_totals[(phase, domain)]
+            totals[0] += 1
+            totals[1] += seconds
+            self._write(entry)
+
+    def start_trace(self, path):
+        """Trace spans to ``path``, keeping the previous run's trace as ``path.1``."""
+        with self._lock:
+            self._close_trace()
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                if os.path.exists(path):
+                    os.replace(path, path + ".1")
+                self._trace = open(path, 'w', encoding='utf-8')
+                self.trace_path = path
+            except Exception as e:
+                logger.error(f"Error starting crawl trace {path}: {str(e)}")
+
+    def count(self, event, amount=1, **labels):
+        key = (event, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += amount
+
+    def _write(self, entry):
+        if self._trace is None:
+            return
+        try:
+            # Flushed per record so a crash or a tail -f sees every finished span
+            self._trace.write(json.dumps(entry, default=str) + "\n")
+            self._trace.flush()
+        except Exception as e:
+            logger.error(f"Error writing crawl trace: {str(e)}")
+
+    def prometheus(self):
+        """All spans and counters in the Prometheus text exposition format."""
+        with self._lock:
+            phase_totals = dict(self._phase_totals)
+            counters = dict(self._counters)
+        lines = [
+            "# HELP scraper_phase_seconds Time spent in each crawl phase, by domain",
+            "# TYPE scraper_phase_seconds summary",
+        ]
+        for (phase, domain), (count, seconds) in sorted(phase_totals.items()):
+            labels = _labels([("phase", phase), ("domain", domain)])
+            lines.append(f"scraper_phase_seconds_sum{labels} {seconds:.6f}")
+            lines.append(f"scraper_phase_seconds_count{labels} {count}")
+        lines += [
+            "# HELP scraper_events_total Crawl events such as retries, fallbacks and selector hits",
+            "# TYPE scraper_events_total counter",
+        ]
+        for (event, labels), value in sorted(counters.items()):
+            lines.append(f"scraper_events_total{_labels((('event', event),) + labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="0.0.0.0"):
+        """Expose ``prometheus()`` on ``http://host:port/metrics`` from a daemon thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            logger.warning(f"Could not serve metrics on port {port}: {str(e)}")
+            return None
+        threading.Thread(target=self._server.serve_forever, name="crawl-metrics", daemon=True).start()
+        logger.info(f"Serving crawl metrics on http://{host}:{port}/metrics")
+        return self._server
+
+    def summary(self, top=5):
+        """Table of phases by total time, then the slowest domains."""
+        with self._lock:
+            samples = {phase: np.array(values) for phase, values in self._phase_samples.items()}
+            phase_totals = dict(self._phase_totals)
+            counters = dict(self._counters)
+
+        phases = collections.defaultdict(lambda: [0, 0.0])
+        for (phase, _), (count, seconds) in phase_totals.items():
+            phases[phase][0] += count
+            phases[phase][1] += seconds
+
+        lines = [f"{'phase':<12}{'count':>8}{'total s':>10}{'mean ms':>10}{'p95 ms':>10}"]
+        for phase, (count, total) in sorted(phases.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{phase:<12}{count:>8}{total:>10.1f}{total / count * 1000:>10.0f}"
+                         f"{np.percentile(samples[phase], 95) * 1000:>10.0f}")
+
+        domains = collections.defaultdict(lambda: [0.0, "", 0.0])
+        for (phase, domain), (_, seconds) in phase_totals.items():
+            if not domain:
+                continue
+            domains[domain][0] += seconds
+            if seconds > domains[domain][2]:
+                domains[domain][1:] = [phase, seconds]
+        if domains:
+            lines.append("")
+            lines.append(f"{'slowest domains':<40}{'total s':>10}  worst phase")
+            for domain, (total, phase, seconds) in sorted(domains.items(), key=lambda item: -item[1][0])[:top]:
+                lines.append(f"{domain:<40}{total:>10.1f}  {phase} ({seconds:.1f}s)")
+
+        events = collections.Counter()
+        for (event, _), value in counters.items():
+            events[event] += value
+        if events:
+            lines.append("")
+            lines.append("events: " + ", ".join(f"{event}={value}" for event, value in sorted(events.items())))
+        return "\n".join(lines)
+
+    def _close_trace(self):
+        if self._trace is not None:
+            self._trace.close()
+            self._trace = None
+
+    def close(self):
+        with self._lock:
+            self._close_trace()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,230 @@
+import asyncio
+import collections
+import functools
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from circuit_breaker import CircuitBreaker, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# Returned by _run_once when the host's circuit opened while the job was queued
+_DEFERRED = object()
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` tokens per second, holding at most ``capacity``."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class HostState:
+    """Politeness budget and counters for a single host."""
+
+    def __init__(self, rate, burst, max_in_flight, breaker):
+        self.bucket = TokenBucket(rate, burst)
+        self.slots = asyncio.Semaphore(max_in_flight)
+        self.breaker = breaker
+        self.queued = 0
+        self.deferred = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.finished_at = collections.deque()
+
+
+class CrawlScheduler:
+    """Asyncio crawl scheduler with per-host and global concurrency limits.
+
+    Every job is keyed by the host of its URL. A job waits for a free slot on
+    its host (``per_host_concurrency``), then a token from the host's bucket
+    (``per_host_rate`` pages per second, bursting up to ``per_host_burst``),
+    then a global slot (``max_concurrency``). Blocking scrape functions run on
+    a thread pool sized to the global cap, so many hosts progress in parallel
+    while each one stays polite.
+
+    A job that raises is retried up to ``max_retries`` times after an
+    exponential backoff with jitter (or the host's Retry-After, when the
+    exception carries one), without holding any slot while it waits. Each
+    host also has a ``CircuitBreaker``: after ``failure_threshold`` failures
+    in a row its remaining jobs are deferred until a single probe succeeds,
+    so a dead host does not tie up workers that healthy hosts could use.
+
+    With a ``CrawlMetrics`` as ``metrics``, the time each job spends waiting
+    for its budgets is recorded as its "queue" phase and retries and opened
+    circuits are counted per host.
+
+    Create the scheduler inside the event loop that runs it.
+    """
+
+    def __init__(self, max_concurrency=8, per_host_concurrency=2, per_host_rate=0.5,
+                 per_host_burst=2, jitter=(0.0, 1.0), rate_window=60, max_retries=2,
+                 backoff_base=2.0, backoff_cap=300.0, failure_threshold=3, reset_timeout=30,
+                 metrics=None):
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_rate = per_host_rate
+        self.per_host_burst = per_host_burst
+        self.jitter = jitter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.rate_window = rate_window
+        self.metrics = metrics
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._hosts = {}
+        self.started_at = time.monotonic()
+
+    def _host(self, host):
+        if host not in self._hosts:
+            self._hosts[host] = HostState(
+                self.per_host_rate, self.per_host_burst, self.per_host_concurrency,
+                CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            )
+        return self._hosts[host]
+
+    async def run(self, func, url, *args, **kwargs):
+        """Run ``func(url, *args, **kwargs)`` once the host and global budgets allow.
+
+        Failures are retried with backoff; the last one is re-raised. Raises
+        ``CircuitOpenError`` if the host's circuit stays open for too long.
+        """
+        host = urlparse(url).netloc
+        state = self._host(host)
+        attempt = 0
+        while True:
+            probe = await self._wait_for_circuit(host, state)
+            try:
+                result = await self._run_once(state, probe, func, url, *args, **kwargs)
+            except Exception as e:
+                retry_after = getattr(e, "retry_after", None)
+                if state.breaker.record_failure(retry_after):
+                    logger.warning(f"Circuit open for {host} after {state.breaker.failures} "
+                                   f"failures; deferring its remaining pages")
+                    if self.metrics:
+                        self.metrics.count("circuit_open", host=host)
+                if attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap, retry_after)
+                attempt += 1
+                if self.metrics:
+                    self.metrics.count("retry", host=host)
+                logger.info(f"Retrying {url} in {delay:.1f}s (attempt {attempt + 1}): {str(e)}")
+                await asyncio.sleep(delay)
+            else:
+                if result is _DEFERRED:
+                    continue
+                state.breaker.record_success()
+                return result
+
+    async def _wait_for_circuit(self, host, state):
+        """Sleep while the host's circuit is open, without holding any slot.
+
+        Returns True if the caller was picked as the half-open probe.
+        """
+        while True:
+            delay = state.breaker.wait_time()
+            if delay <= 0:
+                return state.breaker.state == CircuitBreaker.HALF_OPEN
+            state.deferred += 1
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                state.deferred -= 1
+
+    async def _run_once(self, state, probe, func, url, *args, **kwargs):
+        state.queued += 1
+        queued_at = time.monotonic()
+        started = False
+        try:
+            async with state.slots:
+                if not probe and state.breaker.state != CircuitBreaker.CLOSED:
+                    return _DEFERRED
+                await state.bucket.acquire()
+                # Politeness jitter so requests to one host do not tick like a metronome
+                if self.jitter:
+                    await asyncio.sleep(random.uniform(*self.jitter))
+                async with self._global:
+                    state.queued -= 1
+                    state.in_flight += 1
+                    started = True
+                    if self.metrics:
+                        self.metrics.record("queue", time.monotonic() - queued_at, url)
+                    loop = asyncio.get_running_loop()
+                    call = functools.partial(func, url, *args, **kwargs)
+                    return await loop.run_in_executor(self._executor, call)
+        except Exception:
+            if started:
+                state.failed += 1
+            raise
+        finally:
+            if started:
+                state.in_flight -= 1
+                state.completed += 1
+                state.finished_at.append(time.monotonic())
+            else:
+                state.queued -= 1
+
+    def stats(self):
+        """Live queue depth, in-flight count and per-host completion rate."""
+        now = time.monotonic()
+        hosts = {}
+        for host, state in self._hosts.items():
+            while state.finished_at and now - state.finished_at[0] > self.rate_window:
+                state.finished_at.popleft()
+            window = min(self.rate_window, max(now - self.started_at, 1e-6))
+            hosts[host] = {
+                "queued": state.queued,
+                "in_flight": state.in_flight,
+                "completed": state.completed,
+                "failed": state.failed,
+                "deferred": state.deferred,
+                "circuit": state.breaker.state,
+                "rate": len(state.finished_at) / window,
+            }
+        return {
+            "queued": sum(h["queued"] for h in hosts.values()),
+            "in_flight": sum(h["in_flight"] for h in hosts.values()),
+            "completed": sum(h["completed"] for h in hosts.values()),
+            "deferred": sum(h["deferred"] for h in hosts.values()),
+            "hosts": hosts,
+        }
+
+    async def report_stats(self, interval=10):
+        """Log scheduler stats every ``interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            stats = self.stats()
+            busiest = sorted(stats["hosts"].items(), key=lambda item: -item[1]["queued"])[:5]
+            logger.info(
+                f"Crawl queue: {stats['queued']} queued, {stats['in_flight']} in flight, "
+                f"{stats['completed']} done, {stats['deferred']} deferred | " + ", ".join(
+                    f"{host}: {h['queued']}q/{h['in_flight']}f {h['rate'] * 60:.1f}/min"
+                    + (f" [{h['circuit']}]" if h['circuit'] != "closed" else "")
+                    for host, h in busiest
+                )
+            )
+
+    def close(self):
+        self._executor.shutdown(wait=True)
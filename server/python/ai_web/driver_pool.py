@@ -0,0 +1,144 @@
+import logging
+import queue
+import random
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class DriverPool:
+    """Bounded, thread-safe pool of reusable Selenium drivers.
+
+    Workers borrow a driver with ``acquire()`` (or the ``lease()`` context
+    manager) and hand it back with ``release()``. Drivers are created lazily up
+    to ``max_size`` and reset between leases so one page cannot leak cookies,
+    tabs or a user agent into the next. A driver that fails its reset is
+    treated as broken and quit instead of being returned to the pool.
+
+    With a ``ChromeWatchdog``, drivers are launched and quit through it and a
+    driver it flags as worn out (too many pages or too much memory) is
+    replaced on release instead of being reused.
+    """
+
+    def __init__(self, factory, max_size=3, user_agents=None, watchdog=None):
+        self.factory = factory
+        self.max_size = max_size
+        self.user_agents = list(user_agents or [])
+        self.watchdog = watchdog
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._drivers = set()
+
+    def acquire(self, timeout=None):
+        """Borrow a driver, blocking until a slot is free."""
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("Timed out waiting for a free driver")
+        try:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                return self._create()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, driver, broken=False):
+        """Return a driver to the pool, discarding it if it is unhealthy."""
+        try:
+            if self.watchdog is not None:
+                self.watchdog.page_done(driver)
+                broken = broken or self.watchdog.should_recycle(driver)
+            if broken or not self._tracked(driver) or not self._reset(driver):
+                self._discard(driver)
+            else:
+                self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        driver = self.acquire(timeout=timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self):
+        """Quit every driver the pool has created.
+
+        Drivers that are leased out when the pool closes are quit on release.
+        The pool stays usable and will start fresh drivers on the next acquire.
+        """
+        idle = []
+        while True:
+            try:
+                idle.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        with self._lock:
+            self._drivers.clear()
+        for driver in idle:
+            self._quit(driver)
+        logger.info(f"Driver pool closed ({len(idle)} idle drivers quit)")
+
+    def size(self):
+        with self._lock:
+            return len(self._drivers)
+
+    def _tracked(self, driver):
+        with self._lock:
+            return driver in self._drivers
+
+    def _create(self):
+        driver = self.factory() if self.watchdog is None else self.watchdog.launch(self.factory)
+        with self._lock:
+            self._drivers.add(driver)
+        logger.info(f"Started new pooled driver ({self.size()}/{self.max_size})")
+        return driver
+
+    def _reset(self, driver):
+        """Bring a driver back to a clean state. Returns False if it is broken."""
+        try:
+            # Close any tabs the page opened and go back to the first one
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+
+            # Drop storage for the current origin before navigating away
+            try:
+                driver.execute_script(
+                    "try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}"
+                )
+            except Exception:
+                pass
+
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.get("about:blank")
+
+            if self.user_agents:
+                driver.execute_cdp_cmd(
+                    "Network.setUserAgentOverride",
+                    {"userAgent": random.choice(self.user_agents)}
+                )
+            return True
+        except Exception as e:
+            logger.warning(f"Discarding broken driver: {str(e)}")
+            return False
+
+    def _discard(self, driver):
+        with self._lock:
+            self._drivers.discard(driver)
+        self._quit(driver)
+
+    def _quit(self, driver):
+        if self.watchdog is not None:
+            self.watchdog.quit(driver)
+            return
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Error quitting driver: {str(e)}")
@@ -0,0 +1,334 @@
+from functools import lru_cache
+
+import lxml.html
+from lxml.cssselect import CSSSelector
+
+# Selector cascades shared by the static (lxml) and browser (Selenium) paths.
+# Each list is tried in order and the first selector that matches wins.
+ARTICLE_SELECTORS = [
+    "article",
+    "div.post",
+    "div.entry",
+    ".blog-post",
+    ".news-item",
+    ".card",
+    "section.content div",
+    ".article"
+]
+
+TITLE_SELECTORS = [
+    "h1 a", "h2 a", "h3 a", "h2.entry-title a",
+    "h2", "h3", "h1", ".title a", ".title"
+]
+
+LINK_SELECTORS = ["a", ".readmore", ".more-link", ".read-more"]
+
+LISTING_DATE_SELECTORS = [
+    ".date", ".post-date", ".entry-date", "time", ".meta time",
+    "span.time", ".published"
+]
+
+EXCERPT_SELECTORS = [
+    ".excerpt", ".entry-summary", ".summary", "p", ".description"
+]
+
+CONTENT_SELECTORS = [
+    "article .entry-content",
+    "article .content",
+    "div.entry-content",
+    "div.post-content",
+    "div.article-content",
+    "div.content",
+    "article",
+    "main",
+    ".main-content"
+]
+
+PARAGRAPH_SELECTORS = [
+    "p",
+    "div.paragraph",
+    ".text"
+]
+
+AUTHOR_SELECTORS = [".author", ".byline", ".entry-author", "meta[name='author']"]
+
+ARTICLE_DATE_SELECTORS = [
+    ".date", ".published", ".post-date", ".entry-date",
+    "time", "meta[property='article:published_time']"
+]
+
+# Cascades by field name. Callers may pass reordered copies of these.
+LISTING_CASCADES = {
+    "article": ARTICLE_SELECTORS,
+    "title": TITLE_SELECTORS,
+    "link": LINK_SELECTORS,
+    "date": LISTING_DATE_SELECTORS,
+    "excerpt": EXCERPT_SELECTORS,
+}
+
+ARTICLE_CASCADES = {
+    "content": CONTENT_SELECTORS,
+    "paragraph": PARAGRAPH_SELECTORS,
+    "author": AUTHOR_SELECTORS,
+    "published_date": ARTICLE_DATE_SELECTORS,
+}
+
+# Links to skip in the fallback <a> scan (navigation, social media, etc.)
+SKIP_PATTERNS = ['login', 'register', 'contact', 'about', 'facebook', 'twitter', 'instagram']
+
+# Parent classes that suggest a fallback link sits in an article container
+CONTAINER_TERMS = ['post', 'article', 'entry', 'card', 'content']
+
+# Phrases that show up on pages which only render their content with JavaScript
+JS_GATE_MARKERS = [
+    "enable javascript",
+    "javascript is required",
+    "please turn javascript on",
+    "checking your browser",
+    "just a moment...",
+    "cf-browser-verification",
+    "challenge-platform",
+]
+
+_VISIBLE_TEXT = "descendant-or-self::text()[not(ancestor::script) and not(ancestor::style) and not(ancestor::noscript)]"
+
+
+@lru_cache(maxsize=None)
+def _compile(selector):
+    return CSSSelector(selector)
+
+
+def select(scope, selector):
+    return _compile(selector)(scope)
+
+
+def first_match(scope, cascades, field, hits=None):
+    """Return the elements matched by the first selector in a field's cascade.
+
+    When ``hits`` is given, the winning selector (or "" for a full miss) is
+    counted under ``hits[field]`` so callers can learn which selectors work.
+    """
+    for selector in cascades[field]:
+        elements = select(scope, selector)
+        if elements:
+            _count_hit(hits, field, selector)
+            return elements
+    _count_hit(hits, field, "")
+    return []
+
+
+def _count_hit(hits, field, selector):
+    if hits is not None:
+        counts = hits.setdefault(field, {})
+        counts[selector] = counts.get(selector, 0) + 1
+
+
+def text_of(element):
+    """Visible text of an element, with whitespace collapsed like a rendered page."""
+    if element.tag == "meta":
+        return (element.get("content") or "").strip()
+    return " ".join("".join(element.xpath(_VISIBLE_TEXT)).split())
+
+
+def parse_html(html, base_url):
+    """Parse a page and resolve its links against the page URL."""
+    tree = lxml.html.fromstring(html)
+    tree.make_links_absolute(base_url, resolve_base_href=True)
+    return tree
+
+
+def looks_js_gated(html, tree):
+    """Guess whether a page needs a browser to show its real content."""
+    body = tree.find("body")
+    visible_text = text_of(body if body is not None else tree)
+    if len(visible_text) < 200:
+        return True
+    lowered = html.lower()
+    return len(visible_text) < 1000 and any(marker in lowered for marker in JS_GATE_MARKERS)
+
+
+def extract_listing(tree, cascades=LISTING_CASCADES, hits=None):
+    """Run the listing-page cascades over a parsed page.
+
+    Returns raw ``{title, link, date, excerpt}`` dicts; cleaning and URL
+    validation are left to the caller so both fetch paths share them.
+    """
+    items = []
+    articles = first_match(tree, cascades, "article", hits)
+
+    if articles:
+        for article in articles:
+            title = ""
+            link = ""
+            title_elements = first_match(article, cascades, "title", hits)
+            if title_elements:
+                title = text_of(title_elements[0])
+                if title_elements[0].tag == 'a':
+                    link = title_elements[0].get("href") or ""
+
+            # If no link found in title, try to find it separately
+            if not link and title:
+                link_elements = first_match(article, cascades, "link", hits)
+                if link_elements:
+                    link = link_elements[0].get("href") or ""
+
+            date_elements = first_match(article, cascades, "date", hits)
+            excerpt_elements = first_match(article, cascades, "excerpt", hits)
+
+            items.append({
+                "title": title,
+                "link": link,
+                "date": text_of(date_elements[0]) if date_elements else "",
+                "excerpt": text_of(excerpt_elements[0]) if excerpt_elements else "",
+            })
+    else:
+        # Fallback for pages without clear article structure
+        for link_element in select(tree, "a"):
+            href = link_element.get("href") or ""
+            link_text = text_of(link_element)
+            if not href or len(link_text) < 10:
+                continue
+            if any(pattern in href.lower() for pattern in SKIP_PATTERNS):
+                continue
+
+            parent = link_element.getparent()
+            parent_class = (parent.get("class") or "") if parent is not None else ""
+            if any(term in parent_class.lower() for term in CONTAINER_TERMS):
+                items.append({"title": link_text, "link": href, "date": "", "excerpt": ""})
+
+    return items
+
+
+def extract_article(tree, cascades=ARTICLE_CASCADES, hits=None):
+    """Run the article-page cascades over a parsed page.
+
+    Returns the raw paragraph texts and the metadata found.
+    """
+    containers = first_match(tree, cascades, "content", hits)
+    scope = containers[0] if containers else tree
+    paragraphs = first_match(scope, cascades, "paragraph", hits)
+
+    metadata = {}
+    author_elements = first_match(tree, cascades, "author", hits)
+    if author_elements:
+        metadata["author"] = text_of(author_elements[0])
+    date_elements = first_match(tree, cascades, "published_date", hits)
+    if date_elements:
+        metadata["published_date"] = text_of(date_elements[0])
+
+    return {
+        "paragraphs": [text_of(p) for p in paragraphs],
+        "metadata": metadata,
+    }
+
+
+# Browser-side versions of the cascades above. Each runs as one injected
+# script per page instead of a WebDriver round trip per selector and element.
+_JS_HELPERS = """
+const hits = {};
+const firstMatch = (scope, cascades, field) => {
+    const counts = hits[field] = hits[field] || {};
+    for (const selector of cascades[field]) {
+        let found;
+        try { found = scope.querySelectorAll(selector); } catch (e) { continue; }
+        if (found.length) {
+            counts[selector] = (counts[selector] || 0) + 1;
+            return Array.from(found);
+        }
+    }
+    counts[''] = (counts[''] || 0) + 1;
+    return [];
+};
+const textOf = (el) => el.tagName === 'META'
+    ? (el.getAttribute('content') || '').trim()
+    : (el.innerText || el.textContent || '').trim();
+const hrefOf = (el) => (typeof el.href === 'string' ? el.href : el.getAttribute('href')) || '';
+"""
+
+LISTING_SCRIPT = _JS_HELPERS + """
+const [cascades, skipPatterns, containerTerms] = arguments;
+const items = [];
+const articles = firstMatch(document, cascades, 'article');
+
+if (articles.length) {
+    for (const article of articles) {
+        let title = '';
+        let link = '';
+        const titleElements = firstMatch(article, cascades, 'title');
+        if (titleElements.length) {
+            title = textOf(titleElements[0]);
+            if (titleElements[0].tagName === 'A') link = hrefOf(titleElements[0]);
+        }
+        if (!link && title) {
+            const linkElements = firstMatch(article, cascades, 'link');
+            if (linkElements.length) link = hrefOf(linkElements[0]);
+        }
+        const dateElements = firstMatch(article, cascades, 'date');
+        const excerptElements = firstMatch(article, cascades, 'excerpt');
+        items.push({
+            title: title,
+            link: link,
+            date: dateElements.length ? textOf(dateElements[0]) : '',
+            excerpt: excerptElements.length ? textOf(excerptElements[0]) : ''
+        });
+    }
+} else {
+    for (const anchor of document.querySelectorAll('a')) {
+        const href = hrefOf(anchor);
+        const linkText = textOf(anchor);
+        if (!href || linkText.length < 10) continue;
+        if (skipPatterns.some((pattern) => href.toLowerCase().includes(pattern))) continue;
+        const parent = anchor.parentElement;
+        const parentClass = ((parent && parent.getAttribute('class')) || '').toLowerCase();
+        if (containerTerms.some((term) => parentClass.includes(term))) {
+            items.push({title: linkText, link: href, date: '', excerpt: ''});
+        }
+    }
+}
+return {items: items, used_fallback: articles.length === 0, hits: hits};
+"""
+
+ARTICLE_SCRIPT = _JS_HELPERS + """
+const [cascades] = arguments;
+const containers = firstMatch(document, cascades, 'content');
+const scope = containers.length ? containers[0] : document;
+const paragraphs = firstMatch(scope, cascades, 'paragraph').map(textOf);
+
+const metadata = {};
+const authorElements = firstMatch(document, cascades, 'author');
+if (authorElements.length) metadata.author = textOf(authorElements[0]);
+const dateElements = firstMatch(document, cascades, 'published_date');
+if (dateElements.length) metadata.published_date = textOf(dateElements[0]);
+
+return {paragraphs: paragraphs, metadata: metadata, hits: hits};
+"""
+
+
+def _merge_hits(hits, found):
+    if hits is None:
+        return
+    for field, counts in (found or {}).items():
+        for selector, count in counts.items():
+            field_counts = hits.setdefault(field, {})
+            field_counts[selector] = field_counts.get(selector, 0) + count
+
+
+def extract_listing_in_browser(driver, cascades=LISTING_CASCADES, hits=None):
+    """Run the listing cascades inside the page in a single script call.
+
+    Returns ``(items, used_fallback)`` where items have the same raw shape as
+    ``extract_listing`` and ``used_fallback`` says no article container matched.
+    """
+    result = driver.execute_script(LISTING_SCRIPT, cascades, SKIP_PATTERNS, CONTAINER_TERMS) or {}
+    _merge_hits(hits, result.get("hits"))
+    return result.get("items", []), result.get("used_fallback", True)
+
+
+def extract_article_in_browser(driver, cascades=ARTICLE_CASCADES, hits=None):
+    """Run the article cascades inside the page in a single script call."""
+    result = driver.execute_script(ARTICLE_SCRIPT, cascades) or {}
+    _merge_hits(hits, result.get("hits"))
+    return {
+        "paragraphs": result.get("paragraphs", []),
+        "metadata": result.get("metadata", {}),
+    }
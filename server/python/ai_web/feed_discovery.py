@@ -0,0 +1,380 @@
+import datetime
+import email.utils
+import logging
+import re
+import threading
+import time
+from urllib.parse import urljoin, urlparse, urldefrag, parse_qsl, urlencode, urlunparse
+
+from lxml import etree
+from lxml import html as lxml_html
+
+from json_state import load_json, locked_json
+
+logger = logging.getLogger(__name__)
+
+FEED_TYPES = ("application/rss+xml", "application/atom+xml")
+# Guessed relative to the site root when the page advertises no feed
+FEED_PATHS = ["feed/", "rss/", "feed.xml", "atom.xml", "rss.xml", "index.xml"]
+SITEMAP_PATHS = ["sitemap.xml", "sitemap_index.xml", "wp-sitemap.xml"]
+
+_XML_PARSER = etree.XMLParser(recover=True, resolve_entities=False, no_network=True, huge_tree=True)
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def _child_text(element, *names):
+    for child in element:
+        if _local(child.tag) in names and child.text and child.text.strip():
+            return child.text.strip()
+    return ""
+
+
+def _strip_html(text):
+    if "<" not in text:
+        return " ".join(text.split())
+    try:
+        return " ".join(lxml_html.fromstring(text).text_content().split())
+    except (etree.ParserError, ValueError):
+        return " ".join(re.sub(r"<[^>]+>", " ", text).split())
+
+
+def parse_date(value):
+    """Timestamp from an RFC 822 (RSS) or ISO 8601 (Atom, sitemap) date, or None."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.timestamp()
+
+
+def parse_feed(content, base_url):
+    """Parse an RSS or Atom document.
+
+    Returns ``(items, next_url)`` with items in the listing format
+    (title, link, date, excerpt), or ``(None, None)`` if it is not a feed.
+    ``next_url`` is the RFC 5005 ``rel="next"`` page, when the feed has one.
+    """
+    try:
+        root = etree.fromstring(content, parser=_XML_PARSER)
+    except etree.XMLSyntaxError:
+        return None, None
+    if root is None or _local(root.tag) not in ("rss", "RDF", "feed"):
+        return None, None
+
+    items = []
+    next_url = None
+    for element in root.iter():
+        name = _local(element.tag)
+        if name == "link" and element.get("rel") == "next" and element.getparent() is not None \
+                and _local(element.getparent().tag) in ("channel", "feed"):
+            next_url = urljoin(base_url, element.get("href"))
+        if name not in ("item", "entry"):
+            continue
+        link = ""
+        for child in element:
+            if _local(child.tag) != "link":
+                continue
+            if child.get("href") and child.get("rel", "alternate") == "alternate":
+                link = child.get("href")
+                break
+            if child.text and child.text.strip():
+                link = child.text.strip()
+                break
+        items.append({
+            "title": _strip_html(_child_text(element, "title")),
+            "link": urljoin(base_url, link) if link else "",
+            "date": _child_text(element, "pubDate", "published", "updated", "date"),
+            "excerpt": _strip_html(_child_text(element, "description", "summary", "encoded", "content"))[:300],
+        })
+    return items, next_url
+
+
+def parse_sitemap(content):
+    """Parse a sitemap or sitemap index into ``(pages, child_sitemaps)``.
+
+    Both are lists of dicts with ``loc`` and ``lastmod``; pages also carry a
+    ``title`` when the sitemap uses the Google News extension. Returns
+    ``(None, None)`` if the document is not a sitemap.
+    """
+    try:
+        root = etree.fromstring(content, parser=_XML_PARSER)
+    except etree.XMLSyntaxError:
+        return None, None
+    if root is None or _local(root.tag) not in ("urlset", "sitemapindex"):
+        return None, None
+
+    pages, children = [], []
+    target = pages if _local(root.tag) == "urlset" else children
+    for element in root:
+        if _local(element.tag) not in ("url", "sitemap"):
+            continue
+        loc = _child_text(element, "loc")
+        if not loc:
+            continue
+        entry = {"loc": loc, "lastmod": _child_text(element, "lastmod")}
+        news_title = ""
+        for child in element.iter():
+            if _local(child.tag) == "title" and child.text:
+                news_title = child.text.strip()
+                break
+        if target is pages:
+            entry["title"] = news_title
+        target.append(entry)
+    return pages, children
+
+
+def title_from_slug(url):
+    """Best-effort title from an article URL slug, or "" for non-article paths."""
+    segments = [segment for segment in urlparse(url).path.split("/") if segment]
+    if not segments:
+        return ""
+    slug = re.sub(r"\.\w+$", "", segments[-1])
+    words = [word for word in re.split(r"[-_]+", slug) if word]
+    if len(words) < 3 or all(word.isdigit() for word in words):
+        return ""
+    title = " ".join(words)
+    return title[0].upper() + title[1:]
+
+
+class FeedDiscovery:
+    """Finds and reads RSS/Atom feeds and sitemaps for listing sources.
+
+    ``discover()`` probes a source once: feeds advertised by the page's
+    ``<link rel="alternate">`` tags, then WordPress-style and common feed
+    paths, then sitemaps from robots.txt and the usual locations. Only feeds
+    and sitemaps that actually list articles under the source are kept. The
+    result is cached as JSON and re-probed after ``recheck_days``.
+
+    ``list_articles()`` enumerates a source from what was found. Normal runs
+    read the first feed page and only sitemap entries whose ``lastmod`` is
+    newer than the previous listing; with ``backfill`` set it follows feed
+    pagination for up to ``backfill_pages`` pages and reads whole sitemaps.
+    The previous listing only moves forward through ``mark_listed()``, which
+    callers use once a source's articles were all processed, so articles that
+    failed or were deferred are listed again on the next run.
+    """
+
+    def __init__(self, fetcher, path, recheck_days=7, backfill_pages=20, max_sitemaps=20):
+        self.fetcher = fetcher
+        self.path = path
+        self.recheck_seconds = recheck_days * 24 * 60 * 60
+        self.backfill_pages = backfill_pages
+        self.max_sitemaps = max_sitemaps
+        self.backfill = False
+        self._lock = threading.Lock()
+        self._sources = load_json(path)
+
+    def discover(self, source_url, refresh=False):
+        """Return ``{"feeds": [...], "sitemaps": [...]}`` for a source, probing if needed."""
+        with self._lock:
+            entry = self._sources.get(source_url)
+        if not entry:
+            # Another worker process may have probed it since this one loaded the file
+            entry = load_json(self.path).get(source_url)
+        if entry and not refresh and time.time() - entry["checked_at"] <= self.recheck_seconds:
+            return entry
+
+        feeds, sitemaps = self._probe(source_url)
+        entry = {
+            "feeds": feeds,
+            "sitemaps": sitemaps,
+            "checked_at": time.time(),
+            "listed_at": (entry or {}).get("listed_at"),
+        }
+
+        def store(sources):
+            previous = sources.get(source_url) or {}
+            entry["listed_at"] = max(previous.get("listed_at") or 0, entry["listed_at"] or 0) or None
+            sources[source_url] = entry
+
+        self._update(store)
+        if feeds or sitemaps:
+            logger.info(f"Found {len(feeds)} feed(s) and {len(sitemaps)} sitemap(s) for {source_url}")
+        else:
+            logger.info(f"No feed or sitemap for {source_url}; it will be rendered")
+        return entry
+
+    def list_articles(self, source_url, backfill=None):
+        """Listing items for a source from its feed or sitemap.
+
+        Returns None when the source has neither, so the caller falls back to
+        the rendered page. An empty list means there is a feed or sitemap but
+        nothing new in it. Call ``mark_listed()`` once the items are processed.
+        """
+        backfill = self.backfill if backfill is None else backfill
+        entry = self.discover(source_url)
+        if not entry["feeds"] and not entry["sitemaps"]:
+            return None
+
+        since = None if backfill else entry.get("listed_at")
+        items = None
+        for feed_url in entry["feeds"]:
+            items = self._read_feed(feed_url, self.backfill_pages if backfill else 1, since)
+            if items and self._only_self_links(items, source_url):
+                # A comments feed cached before such feeds were rejected
+                items = None
+            if items is not None:
+                break
+        if items is None:
+            for sitemap_url in entry["sitemaps"]:
+                items = self._read_sitemap(sitemap_url, source_url, since)
+                if items is not None:
+                    break
+        if items is None:
+            # Everything we knew about has gone away; probe again next time
+            self._update(lambda sources: sources.pop(source_url, None))
+            return None
+        return items
+
+    def mark_listed(self, source_url, listed_at):
+        """Start the next normal listing of ``source_url`` from ``listed_at``.
+
+        ``listed_at`` is the time the processed listing was taken, so entries
+        published while the crawl ran are not skipped.
+        """
+        def advance(sources):
+            # Read back from the file, as the source may have been discovered by another process
+            entry = sources.get(source_url)
+            if entry is not None and (entry.get("listed_at") or 0) < listed_at:
+                entry["listed_at"] = listed_at
+
+        self._update(advance)
+
+    def _probe(self, source_url):
+        source_path = urlparse(source_url).path or "/"
+        is_root = source_path == "/"
+        base = source_url if source_url.endswith("/") else source_url + "/"
+        origin = urljoin(source_url, "/")
+
+        def in_scope(url):
+            return is_root or urlparse(url).path.startswith(source_path)
+
+        feeds = []
+        candidates = []
+        html = self.fetcher.fetch(source_url)
+        if html:
+            try:
+                tree = lxml_html.fromstring(html, base_url=source_url)
+                for link in tree.xpath("//link[@rel='alternate'][@href]"):
+                    if link.get("type", "").split(";")[0].strip() in FEED_TYPES:
+                        candidates.append(urljoin(source_url, link.get("href")))
+            except (etree.ParserError, ValueError) as e:
+                logger.info(f"Could not parse {source_url} for feed links: {str(e)}")
+        # WordPress serves a feed for any archive path, e.g. /tag/indie-games/feed/
+        candidates.append(urljoin(base, "feed/"))
+        if is_root:
+            candidates.extend(urljoin(origin, path) for path in FEED_PATHS)
+
+        for candidate in dict.fromkeys(candidates):
+            if not in_scope(candidate):
+                continue
+            content = self.fetcher.fetch_xml(candidate)
+            items, _ = parse_feed(content, candidate) if content else (None, None)
+            if items and not self._only_self_links(items, source_url):
+                feeds.append(candidate)
+                break
+
+        sitemaps = []
+        if not feeds:
+            sitemap_candidates = []
+            robots = self.fetcher.fetch_xml(urljoin(origin, "robots.txt"))
+            if robots:
+                for line in robots.decode("utf-8", errors="replace").splitlines():
+                    if line.lower().startswith("sitemap:"):
+                        sitemap_candidates.append(line.split(":", 1)[1].strip())
+            sitemap_candidates.extend(urljoin(origin, path) for path in SITEMAP_PATHS)
+            for candidate in dict.fromkeys(sitemap_candidates):
+                if self._read_sitemap(candidate, source_url, None):
+                    sitemaps.append(candidate)
+                    break
+        return feeds, sitemaps
+
+    @staticmethod
+    def _only_self_links(items, source_url):
+        """True for a feed whose items all link back to the source page, e.g. a
+        WordPress comments feed at ``<post>/feed/`` with ``<post>#comment-N`` links."""
+        page = urldefrag(source_url)[0].rstrip("/")
+        return all(urldefrag(item["link"] or "")[0].rstrip("/") == page for item in items)
+
+    def _read_feed(self, feed_url, max_pages, since):
+        """Read up to ``max_pages`` pages of a feed, stopping at items older than ``since``."""
+        items, seen = [], set()
+        page_url = feed_url
+        for page in range(1, max_pages + 1):
+            content = self.fetcher.fetch_xml(page_url)
+            page_items, next_url = parse_feed(content, page_url) if content else (None, None)
+            if page_items is None:
+                return items if page > 1 else None
+            new_items = [item for item in page_items if item["link"] and item["link"] not in seen]
+            if not new_items:
+                break
+            for item in new_items:
+                seen.add(item["link"])
+            items.extend(new_items)
+            dates = [parse_date(item["date"]) for item in new_items]
+            if since and all(date is not None and date < since for date in dates):
+                break
+            # RFC 5005 paging when offered, otherwise WordPress' ?paged=N
+            page_url = next_url or self._with_query(feed_url, paged=page + 1)
+        return items
+
+    def _read_sitemap(self, sitemap_url, source_url, since):
+        """Article URLs under ``source_url`` from a sitemap (index), newer than ``since``."""
+        source_path = urlparse(source_url).path or "/"
+        pending, visited, items = [sitemap_url], 0, []
+        found_any = False
+        while pending and visited < self.max_sitemaps:
+            url = pending.pop(0)
+            visited += 1
+            content = self.fetcher.fetch_xml(url)
+            pages, children = parse_sitemap(content) if content else (None, None)
+            if pages is None:
+                continue
+            found_any = True
+            # Newest child sitemaps first, so the cap drops the oldest ones
+            children.sort(key=lambda child: parse_date(child["lastmod"]) or 0, reverse=True)
+            for child in children:
+                modified = parse_date(child["lastmod"])
+                if since and modified is not None and modified < since:
+                    continue
+                pending.append(child["loc"])
+            for entry in pages:
+                path = urlparse(entry["loc"]).path or "/"
+                if not path.startswith(source_path) or entry["loc"].rstrip("/") == source_url.rstrip("/"):
+                    continue
+                modified = parse_date(entry["lastmod"])
+                if since and modified is not None and modified < since:
+                    continue
+                title = entry["title"] or title_from_slug(entry["loc"])
+                if title:
+                    items.append({"title": title, "link": entry["loc"], "date": entry["lastmod"], "excerpt": ""})
+        return items if found_any else None
+
+    @staticmethod
+    def _with_query(url, **params):
+        parts = urlparse(url)
+        query = dict(parse_qsl(parts.query))
+        query.update({key: str(value) for key, value in params.items()})
+        return urlunparse(parts._replace(query=urlencode(query)))
+
+    def _update(self, change):
+        """Apply ``change`` to the sources on disk, keeping what other processes wrote."""
+        with self._lock:
+            try:
+                with locked_json(self.path) as sources:
+                    change(sources)
+                self._sources = sources
+            except Exception as e:
+                logger.error(f"Error saving feed discovery cache to {self.path}: {str(e)}")
+                change(self._sources)
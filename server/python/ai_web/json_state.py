@@ -0,0 +1,49 @@
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes stay atomic but are not serialized across processes
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def load_json(path, default=None):
+    """Contents of a JSON state file, or ``default`` if it is missing or unreadable."""
+    try:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    except Exception as e:
+        logger.error(f"Error loading {path}: {str(e)}")
+    return {} if default is None else default
+
+
+@contextmanager
+def locked_json(path):
+    """Re-read a JSON state file under an exclusive lock and write back the caller's changes.
+
+    Several processes (Celery workers, reextract.py next to a crawl) share
+    the same state files. Each update takes a lock on ``<path>.lock``,
+    yields the file's current contents for the caller to change in place,
+    and replaces the file atomically, so no process overwrites another's
+    changes with its own stale copy.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            data = load_json(path)
+            yield data
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, path)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
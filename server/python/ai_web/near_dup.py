@@ -0,0 +1,81 @@
+import re
+import zlib
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_WORD = re.compile(r"\w+")
+
+
+class NearDuplicateIndex:
+    """MinHash + LSH index for spotting near-duplicate article content.
+
+    Text is split into overlapping word shingles, each shingle is hashed to
+    32 bits and the set is reduced to a ``num_perm`` MinHash signature. The
+    signature is cut into ``bands`` bands; documents sharing any band bucket
+    become candidates, and a candidate only counts as a duplicate when the
+    signatures agree on at least ``threshold`` of their positions (an
+    estimate of Jaccard similarity). Lookups only touch documents sharing a
+    bucket, so the cost stays sub-quadratic as the corpus grows.
+    """
+
+    def __init__(self, threshold=0.8, num_perm=120, bands=20, shingle_size=5, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        # Kept below 2**32 so a * hash + b cannot overflow uint64
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._buckets = [{} for _ in range(bands)]
+        self._signatures = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _shingles(self, text):
+        words = _WORD.findall(text.lower())
+        if not words:
+            return set()
+        if len(words) <= self.shingle_size:
+            return {" ".join(words)}
+        return {
+            " ".join(words[i:i + self.shingle_size])
+            for i in range(len(words) - self.shingle_size + 1)
+        }
+
+    def signature(self, text):
+        """MinHash signature of ``text``, or None if it has no words to compare."""
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in self._shingles(text or "")),
+            dtype=np.uint64
+        )
+        if not len(hashes):
+            return None
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def find(self, signature):
+        """Return the key of an indexed near-duplicate of ``signature``, or None."""
+        candidates = set()
+        for band, key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+        best_key, best_score = None, self.threshold
+        for candidate in candidates:
+            score = float(np.mean(self._signatures[candidate] == signature))
+            if score >= best_score:
+                best_key, best_score = candidate, score
+        return best_key
+
+    def add(self, key, signature):
+        self._signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band].setdefault(band_key, []).append(key)
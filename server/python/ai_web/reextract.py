@@ -0,0 +1,77 @@
+import argparse
+import datetime
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from AiScraper import build_listing_records, build_article_result, build_article_data
+from extraction import parse_html, extract_listing, extract_article
+from near_dup import NearDuplicateIndex
+from result_writer import ResultWriter
+from snapshot_store import SnapshotStore
+
+logger = logging.getLogger(__name__)
+
+# Snapshot store opened once per worker process
+_store = None
+
+
+def _init_worker(snapshot_dir):
+    global _store
+    _store = SnapshotStore(snapshot_dir)
+
+
+def extract_snapshot(entry):
+    """Replay extraction for one manifest entry. Runs in a worker process."""
+    try:
+        tree = parse_html(_store.load(entry["hash"]), entry["url"])
+        if entry["kind"] == "listing":
+            items = extract_listing(tree)
+            return entry, build_listing_records(items, entry.get("category", ""), entry["url"])
+        raw = extract_article(tree)
+        return entry, build_article_result(raw["paragraphs"], raw["metadata"])
+    except Exception as e:
+        logger.error(f"Error re-extracting {entry['url']}: {str(e)}")
+        return entry, None
+
+
+def reextract(snapshot_dir="output/snapshots", output_dir="output/reextract", workers=None):
+    """Re-run extraction over every stored snapshot using all cores"""
+    start_time = time.time()
+    entries = SnapshotStore(snapshot_dir).entries()
+    listings = [entry for entry in entries if entry["kind"] == "listing"]
+    articles = [entry for entry in entries if entry["kind"] == "article"]
+    logger.info(f"Re-extracting {len(listings)} listing and {len(articles)} article snapshots")
+
+    writer = ResultWriter(output_dir, dedup=NearDuplicateIndex())
+    items_by_link = {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(snapshot_dir,)) as executor:
+            # Listings first, so articles can pick up their title and category
+            for entry, records in executor.map(extract_snapshot, listings, chunksize=4):
+                for record in records or []:
+                    writer.add_listing(record)
+                    items_by_link.setdefault(record["link"], record)
+
+            for entry, result in executor.map(extract_snapshot, articles, chunksize=16):
+                if not result:
+                    logger.warning(f"No content re-extracted for: {entry['url']}")
+                    continue
+                item = items_by_link.get(entry["url"], {"title": "", "link": entry["url"], "category": ""})
+                writer.add_article(build_article_data(item, result))
+    finally:
+        writer.close()
+
+    total_time = time.time() - start_time
+    logger.info(f"Re-extraction finished in {datetime.timedelta(seconds=int(total_time))}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay extraction over stored page snapshots")
+    parser.add_argument("--snapshots", default="output/snapshots", help="Snapshot store directory")
+    parser.add_argument("--output", default="output/reextract", help="Directory for the re-extracted data")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    args = parser.parse_args()
+    reextract(args.snapshots, args.output, args.workers)
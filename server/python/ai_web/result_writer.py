@@ -0,0 +1,220 @@
+import importlib.util
+import json
+import logging
+import math
+import os
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+LISTING_FIELDS = ["title", "link", "date", "excerpt", "category", "source_url"]
+ARTICLE_FIELDS = ["title", "link", "category", "content", "author", "published_date"]
+
+
+def _normalize(record, fieldnames):
+    """Keep the known fields as strings, turning NaN and missing values into None."""
+    normalized = {}
+    for field in fieldnames:
+        value = record.get(field)
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            normalized[field] = None
+        else:
+            normalized[field] = str(value)
+    return normalized
+
+
+class JsonLinesSink:
+    """Appends one strict-JSON record per line."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False, allow_nan=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class JsonArraySink:
+    """Writes a JSON array one element at a time, closing it off in ``close()``."""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = open(path, 'w', encoding='utf-8')
+        self._file.write("[")
+
+    def write(self, record):
+        self._file.write(",\n  " if self.count else "\n  ")
+        self._file.write(json.dumps(record, ensure_ascii=False, allow_nan=False))
+        self._file.flush()
+        self.count += 1
+
+    def close(self):
+        self._file.write("\n]\n" if self.count else "]\n")
+        self._file.close()
+
+
+class ParquetDatasetSink:
+    """Streams records into a Hive-partitioned Parquet dataset.
+
+    Records are buffered per partition value and written as a row group
+    every ``row_group_size`` records, so memory stays bounded by the number
+    of partitions rather than the size of the corpus. Each partition lives in
+    ``<root>/<partition_by>=<value>/part-0.parquet`` and the partition column
+    itself is carried by the directory name, as Hive-style readers expect.
+
+    Needs ``pyarrow`` (``pip install pyarrow``), which is only imported here.
+    """
+
+    def __init__(self, root, fieldnames, partition_by="category", row_group_size=500):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._pa = pa
+        self._pq = pq
+        self.root = root
+        self.partition_by = partition_by
+        self.row_group_size = row_group_size
+        self.fields = [field for field in fieldnames if field != partition_by]
+        self.schema = pa.schema([(field, pa.string()) for field in self.fields])
+        self._buffers = {}
+        self._writers = {}
+        # Each run replaces the previous dataset, like the other output files
+        self._clear()
+        os.makedirs(root, exist_ok=True)
+
+    def _clear(self):
+        """Delete the partition files an earlier run wrote, and nothing else under ``root``."""
+        if not os.path.isdir(self.root):
+            return
+        for entry in os.listdir(self.root):
+            directory = os.path.join(self.root, entry)
+            if not entry.startswith(f"{self.partition_by}=") or not os.path.isdir(directory):
+                continue
+            part = os.path.join(directory, "part-0.parquet")
+            if os.path.isfile(part):
+                os.remove(part)
+            if not os.listdir(directory):
+                os.rmdir(directory)
+
+    def write(self, record):
+        partition = record.get(self.partition_by) or "uncategorized"
+        rows = self._buffers.setdefault(partition, [])
+        rows.append({field: record.get(field) for field in self.fields})
+        if len(rows) >= self.row_group_size:
+            self._flush(partition)
+
+    def _flush(self, partition):
+        rows = self._buffers.get(partition)
+        if not rows:
+            return
+        if partition not in self._writers:
+            safe_value = re.sub(r"[^\w.-]", "_", partition)
+            directory = os.path.join(self.root, f"{self.partition_by}={safe_value}")
+            os.makedirs(directory, exist_ok=True)
+            self._writers[partition] = self._pq.ParquetWriter(
+                os.path.join(directory, "part-0.parquet"), self.schema, compression="zstd"
+            )
+        self._writers[partition].write_table(self._pa.Table.from_pylist(rows, schema=self.schema))
+        self._buffers[partition] = []
+
+    def close(self):
+        for partition in list(self._buffers):
+            self._flush(partition)
+        for writer in self._writers.values():
+            writer.close()
+
+
+class RecordSink:
+    """Streams one kind of record to JSON Lines and a partitioned Parquet dataset.
+
+    Writes ``<basename>.jsonl`` and, with ``parquet=True``,
+    ``<basename>.parquet/`` as records arrive. With ``json_array=True`` it
+    also keeps ``<basename>.json`` as a streamed JSON array for readers that
+    expect the old single-file format.
+    """
+
+    def __init__(self, basename, fieldnames, json_array=False, parquet=True):
+        self.basename = basename
+        self.fieldnames = fieldnames
+        self.parquet = parquet
+        self.count = 0
+        self._sinks = [JsonLinesSink(f"{basename}.jsonl")]
+        if parquet:
+            self._sinks.append(ParquetDatasetSink(f"{basename}.parquet", fieldnames))
+        if json_array:
+            self._sinks.append(JsonArraySink(f"{basename}.json"))
+
+    def write(self, record):
+        record = _normalize(record, self.fieldnames)
+        for sink in self._sinks:
+            sink.write(record)
+        self.count += 1
+
+    def close(self):
+        for sink in self._sinks:
+            sink.close()
+        formats = ".jsonl/.parquet" if self.parquet else ".jsonl"
+        logger.info(f"Data saved to {self.basename}{formats} ({self.count} records)")
+
+
+class ResultWriter:
+    """Append-only output stage for listing and article records.
+
+    Listing records go to ``scraped_data`` and article records to
+    ``detailed_data``, each as JSON Lines plus a Parquet dataset partitioned
+    by category, so a consumer can read one category or column without
+    parsing everything. ``detailed_data.json`` is still produced for the Go
+    API, which loads it as model context. When a ``NearDuplicateIndex`` is
+    given, articles whose content nearly matches one already written are
+    dropped before they reach any file.
+
+    The Parquet datasets need ``pyarrow``. By default they are written when
+    it is installed and skipped with a warning otherwise; ``parquet=True``
+    requires it and ``parquet=False`` turns them off.
+    """
+
+    def __init__(self, output_dir="output", dedup=None, parquet=None):
+        if parquet is None:
+            parquet = importlib.util.find_spec("pyarrow") is not None
+            if not parquet:
+                logger.warning("pyarrow is not installed; writing JSON output only")
+        self.output_dir = output_dir
+        self.dedup = dedup
+        self.duplicates = 0
+        self.category_counts = {}
+        os.makedirs(output_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.listings = RecordSink(os.path.join(output_dir, "scraped_data"), LISTING_FIELDS, parquet=parquet)
+        self.articles = RecordSink(os.path.join(output_dir, "detailed_data"), ARTICLE_FIELDS,
+                                   json_array=True, parquet=parquet)
+
+    def add_listing(self, record):
+        with self._lock:
+            self.listings.write(record)
+
+    def add_article(self, record):
+        """Write an article record. Returns False if it was dropped as a near-duplicate."""
+        signature = self.dedup.signature(record.get("content", "")) if self.dedup is not None else None
+        with self._lock:
+            # Articles without any words are not compared, or they would all match each other
+            if signature is not None:
+                duplicate_of = self.dedup.find(signature)
+                if duplicate_of is not None:
+                    self.duplicates += 1
+                    logger.info(f"Dropping near-duplicate of {duplicate_of}: {record.get('link')}")
+                    return False
+                self.dedup.add(record.get("link") or self.articles.count, signature)
+            self.articles.write(record)
+            category = record.get("category") or "uncategorized"
+            self.category_counts[category] = self.category_counts.get(category, 0) + 1
+        return True
+
+    def close(self):
+        with self._lock:
+            self.listings.close()
+            self.articles.close()
@@ -0,0 +1,123 @@
+import json
+import logging
+import threading
+
+from json_state import load_json, locked_json
+
+logger = logging.getLogger(__name__)
+
+
+class SelectorStats:
+    """Persisted per-domain record of which selector wins each cascade.
+
+    For every domain and field it keeps hit and miss counts per selector,
+    saved as JSON so the selector lists can be tuned from real data.
+
+    The default cascade order stays the source of truth. ``cascades()`` only
+    tries a domain's last winner first once it has won ``min_streak`` pages
+    in a row and no selector listed before it has ever matched there, and a
+    miss falls through to the default order. Every
+    ``recheck_every`` pages the default order is used as is, so a selector
+    that only won because of an odd page (a landing or 404 page) loses its
+    place again. Winners are kept in memory and never saved, so a bad order
+    cannot outlive the process.
+    """
+
+    def __init__(self, path, save_every=50, min_streak=3, recheck_every=20):
+        self.path = path
+        self.save_every = save_every
+        self.min_streak = min_streak
+        self.recheck_every = recheck_every
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._winners = {}
+        self._stats = load_json(path)
+        # Counts added since the last save, merged into the file so other processes' counts are kept
+        self._unsaved = {}
+
+    def cascades(self, domain, defaults):
+        """Return ``defaults`` with each field's settled winner for ``domain`` tried first."""
+        with self._lock:
+            winners = self._winners.get(domain, {})
+            domain_stats = self._stats.get(domain, {})
+            ordered = {}
+            for field, selectors in defaults.items():
+                winner = winners.get(field)
+                if winner is None or winner["selector"] not in selectors or winner["streak"] < self.min_streak:
+                    ordered[field] = list(selectors)
+                    continue
+                # Never jump ahead of a more specific selector that has matched on this domain
+                counts = domain_stats.get(field, {})
+                earlier = selectors[:selectors.index(winner["selector"])]
+                if any(counts.get(s, {}).get("hits", 0) for s in earlier):
+                    ordered[field] = list(selectors)
+                    continue
+                winner["uses"] += 1
+                if winner["uses"] >= self.recheck_every:
+                    # Re-check the default order now and then; record() replaces the winner if it lost
+                    winner["uses"] = 0
+                    ordered[field] = list(selectors)
+                    continue
+                ordered[field] = [winner["selector"]] + [s for s in selectors if s != winner["selector"]]
+            return ordered
+
+    def record(self, domain, cascades, hits):
+        """Add the hits from one page, extracted with the given cascade order.
+
+        ``hits`` maps field to ``{selector: count}``, with "" counting full
+        misses. Every selector tried before the winner is counted as a miss.
+        """
+        with self._lock:
+            domain_stats = self._stats.setdefault(domain, {})
+            winners = self._winners.setdefault(domain, {})
+            for field, counts in hits.items():
+                matched = {selector: count for selector, count in counts.items() if selector and count}
+                if matched:
+                    best = max(matched, key=matched.get)
+                    winner = winners.get(field)
+                    if winner is not None and winner["selector"] == best:
+                        winner["streak"] += 1
+                    else:
+                        winners[field] = {"selector": best, "streak": 1, "uses": 0}
+                order = cascades.get(field, [])
+                field_stats = domain_stats.setdefault(field, {})
+                unsaved = self._unsaved.setdefault(domain, {}).setdefault(field, {})
+                for selector, count in counts.items():
+                    tried = order[:order.index(selector)] if selector in order else order
+                    for missed in tried:
+                        _add(field_stats, missed, "misses", count)
+                        _add(unsaved, missed, "misses", count)
+                    if selector:
+                        _add(field_stats, selector, "hits", count)
+                        _add(unsaved, selector, "hits", count)
+            self._pending += 1
+            if self._pending >= self.save_every:
+                self._save()
+
+    def report(self):
+        """Hit and miss counts by domain, field and selector."""
+        with self._lock:
+            return json.loads(json.dumps(self._stats))
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        self._pending = 0
+        try:
+            with locked_json(self.path) as stats:
+                for domain, fields in self._unsaved.items():
+                    for field, selectors in fields.items():
+                        field_stats = stats.setdefault(domain, {}).setdefault(field, {})
+                        for selector, counts in selectors.items():
+                            for kind, count in counts.items():
+                                _add(field_stats, selector, kind, count)
+            self._stats = stats
+            self._unsaved = {}
+        except Exception as e:
+            logger.error(f"Error saving selector stats to {self.path}: {str(e)}")
+
+
+def _add(field_stats, selector, kind, count):
+    field_stats.setdefault(selector, {"hits": 0, "misses": 0})[kind] += count
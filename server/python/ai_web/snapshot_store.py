@@ -0,0 +1,80 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import zstandard
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotStore:
+    """Content-addressed store of raw fetched pages.
+
+    Every page is saved once as a zstd-compressed blob named after the
+    SHA-256 of its HTML, and each fetch appends a line to ``manifest.jsonl``
+    mapping the URL, page kind and fetch time to that hash. This keeps enough
+    to replay extraction offline after the selectors or cleaning change.
+    """
+
+    def __init__(self, directory, level=10):
+        self.directory = directory
+        self.level = level
+        self.manifest_path = os.path.join(directory, "manifest.jsonl")
+        self._lock = threading.Lock()
+        self._last_hash = {}
+
+    def _blob_path(self, digest):
+        return os.path.join(self.directory, "blobs", digest[:2], f"{digest}.zst")
+
+    def save(self, url, html, kind, **context):
+        """Store a page and record the fetch in the manifest. Returns the blob hash."""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(digest)
+
+        if not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            # Compressor objects are not thread-safe, so build one per call
+            compressed = zstandard.ZstdCompressor(level=self.level).compress(data)
+            tmp_path = f"{blob_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(compressed)
+            os.replace(tmp_path, blob_path)
+
+        entry = {"url": url, "kind": kind, "fetched_at": time.time(), "hash": digest}
+        entry.update(context)
+        with self._lock:
+            # Skip manifest lines that would only repeat the previous fetch of this page
+            if self._last_hash.get((url, kind)) == digest:
+                return digest
+            self._last_hash[(url, kind)] = digest
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.manifest_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return digest
+
+    def load(self, digest):
+        with open(self._blob_path(digest), 'rb') as f:
+            return zstandard.ZstdDecompressor().decompress(f.read()).decode("utf-8")
+
+    def entries(self, latest_only=True):
+        """Manifest entries, by default only the most recent one per URL and kind."""
+        if not os.path.exists(self.manifest_path):
+            return []
+        entries = []
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    entries.append(json.loads(line))
+        if not latest_only:
+            return entries
+        latest = {}
+        for entry in entries:
+            key = (entry["url"], entry["kind"])
+            if key not in latest or entry["fetched_at"] >= latest[key]["fetched_at"]:
+                latest[key] = entry
+        return list(latest.values())
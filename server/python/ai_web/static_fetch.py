@@ -0,0 +1,133 @@
+import gzip
+import logging
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from circuit_breaker import TransientFetchError, parse_retry_after
+from json_state import load_json, locked_json
+
+logger = logging.getLogger(__name__)
+
+
+class StaticFetcher:
+    """Pooled keep-alive HTTP session for pages that do not need a browser."""
+
+    def __init__(self, user_agents=None, pool_size=10, timeout=15, cache=None, max_age=0):
+        self.user_agents = list(user_agents or [])
+        self.timeout = timeout
+        # Optional HttpCache; pages younger than max_age seconds are served without a request
+        self.cache = cache
+        self.max_age = max_age
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def fetch(self, url):
+        """Fetch a page and return its HTML, or None if it is not usable HTML.
+
+        Raises ``TransientFetchError`` when the host is unreachable, rate
+        limiting (429) or failing (5xx), since a browser would fare no better.
+        """
+        response = self._get(url, "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8")
+        if response is None:
+            return None
+        if "html" not in response.headers.get("Content-Type", "html"):
+            logger.info(f"Static fetch got non-HTML content for {url}")
+            return None
+        return response.text
+
+    def fetch_xml(self, url):
+        """Fetch a feed or sitemap and return its raw bytes, or None if there is none.
+
+        HTML responses are treated as missing, since many sites answer
+        unknown paths with a 200 page instead of a 404.
+        """
+        response = self._get(url, "application/rss+xml,application/atom+xml,application/xml;q=0.9,"
+                                   "text/xml;q=0.9,*/*;q=0.5")
+        if response is None:
+            return None
+        if "html" in response.headers.get("Content-Type", ""):
+            return None
+        content = response.content
+        # Compressed sitemaps are often served as a plain gzip file
+        if content[:2] == b"\x1f\x8b":
+            try:
+                content = gzip.decompress(content)
+            except OSError as e:
+                logger.info(f"Could not decompress {url}: {str(e)}")
+                return None
+        return content
+
+    def _get(self, url, accept):
+        headers = {"Accept": accept}
+        if self.user_agents:
+            headers["User-Agent"] = random.choice(self.user_agents)
+
+        try:
+            if self.cache is not None:
+                response = self.cache.fetch(self.session, url, headers=headers,
+                                            timeout=self.timeout, max_age=self.max_age)
+            else:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise TransientFetchError(url, f"Connection failed: {str(e)}")
+        except requests.RequestException as e:
+            logger.warning(f"Static fetch failed for {url}: {str(e)}")
+            return None
+
+        if response.status_code == 429 or response.status_code >= 500:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            raise TransientFetchError(url, f"HTTP {response.status_code}", retry_after)
+        if response.status_code != 200:
+            logger.info(f"Static fetch got HTTP {response.status_code} for {url}")
+            return None
+        return response
+
+    def close(self):
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+class FetchModeStore:
+    """Remembers which fetch path ("static" or "browser") each domain needed.
+
+    Entries are kept per domain and page kind ("listing" or "article") and
+    persisted as JSON so later runs skip the attempt that failed last time.
+    They expire after ``recheck_days`` so a site that drops its JavaScript
+    gate gets a chance to move back to the cheap path.
+    """
+
+    def __init__(self, path, recheck_days=7):
+        self.path = path
+        self.recheck_seconds = recheck_days * 24 * 60 * 60
+        self._lock = threading.Lock()
+        self._modes = load_json(path)
+
+    def get(self, domain, kind):
+        with self._lock:
+            entry = self._modes.get(domain, {}).get(kind)
+        if not entry or time.time() - entry["updated_at"] > self.recheck_seconds:
+            return None
+        return entry["mode"]
+
+    def set(self, domain, kind, mode):
+        with self._lock:
+            current = self._modes.setdefault(domain, {}).get(kind)
+            if current and current["mode"] == mode and \
+                    time.time() - current["updated_at"] <= self.recheck_seconds:
+                return
+            entry = self._modes[domain][kind] = {"mode": mode, "updated_at": time.time()}
+            try:
+                # Re-read under the file lock so modes other worker processes learned are kept
+                with locked_json(self.path) as modes:
+                    modes.setdefault(domain, {})[kind] = entry
+                self._modes = modes
+            except Exception as e:
+                logger.error(f"Error saving fetch modes to {self.path}: {str(e)}")
+        logger.info(f"Using {mode} fetch path for {kind} pages on {domain}")
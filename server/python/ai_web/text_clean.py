@@ -0,0 +1,85 @@
+import re
+
+import pandas as pd
+
+# Share-button and footer boilerplate, removed case-sensitively
+SHARE_TEXTS = [
+    "Click to share on Facebook",
+    "Click to share on Reddit",
+    "Click to share on LinkedIn",
+    "Click to share on WhatsApp",
+    "Click to share on Threads",
+    "Click to share on Bluesky",
+    "Click to share on Mastodon",
+    "Click to share on Telegram",
+    "Click to share on Pinterest",
+    "Click to share on X",
+    "Click to print",
+    "Click to email a link to a friend",
+    "Terms of Use",
+    "Get Started - It's Free",
+    "Cloudflare",
+]
+
+# Common ads and cookie messages, removed regardless of case
+COOKIE_PHRASES = [
+    "accept all cookies",
+    "cookie policy",
+    "privacy policy",
+    "accept cookies",
+    "we use cookies",
+]
+
+
+class TextCleaner:
+    """Precompiled cleaner that strips boilerplate from scraped text.
+
+    All phrases and URLs are folded into one alternation regex so each text
+    is scanned once, then whitespace (including non-breaking spaces) is
+    collapsed. Longer phrases come first so they win over their prefixes.
+    """
+
+    def __init__(self, phrases=SHARE_TEXTS, ignore_case_phrases=COOKIE_PHRASES):
+        alternatives = [re.escape(phrase) for phrase in sorted(phrases, key=len, reverse=True)]
+        alternatives.append(r"http\S+")
+        if ignore_case_phrases:
+            # Allow any run of whitespace between words, as text is not normalized yet
+            folded = [
+                r"\s+".join(re.escape(word) for word in phrase.split())
+                for phrase in sorted(ignore_case_phrases, key=len, reverse=True)
+            ]
+            alternatives.append("(?i:" + "|".join(folded) + ")")
+        self.pattern = re.compile("|".join(alternatives))
+
+    def clean(self, text):
+        if not text:
+            return ""
+        return " ".join(self.pattern.sub("", text).split())
+
+    def clean_many(self, texts):
+        """Clean a list or pandas Series of texts in one call.
+
+        A Series is cleaned with vectorized string operations and returned as
+        a Series with the same index; anything else comes back as a list.
+        Missing values become empty strings.
+        """
+        if isinstance(texts, pd.Series):
+            return (
+                texts.fillna("").astype(str)
+                .str.replace(self.pattern, "", regex=True)
+                .str.split()
+                .str.join(" ")
+            )
+        sub = self.pattern.sub
+        return [" ".join(sub("", text).split()) if isinstance(text, str) and text else "" for text in texts]
+
+
+_default_cleaner = TextCleaner()
+
+
+def clean_text(text):
+    return _default_cleaner.clean(text)
+
+
+def clean_texts(texts):
+    return _default_cleaner.clean_many(texts)
@@ -0,0 +1,81 @@
+import logging
+
+from selenium.common.exceptions import WebDriverException
+
+logger = logging.getLogger(__name__)
+
+IMAGE_PATTERNS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico", "*.bmp"]
+MEDIA_PATTERNS = ["*.mp4", "*.webm", "*.m3u8", "*.mpd", "*.ts", "*.mp3", "*.ogg", "*.wav", "*.m4a"]
+FONT_PATTERNS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"]
+
+# Ad, analytics and tag-manager hosts; never needed to read page text or counts
+TRACKER_PATTERNS = [
+    "*doubleclick.net*", "*googlesyndication.com*", "*googletagmanager.com*",
+    "*googletagservices.com*", "*google-analytics.com*", "*adservice.google.*",
+    "*amazon-adsystem.com*", "*adnxs.com*", "*criteo.com*", "*criteo.net*",
+    "*taboola.com*", "*outbrain.com*", "*scorecardresearch.com*", "*quantserve.com*",
+    "*hotjar.com*", "*segment.io*", "*chartbeat.com*", "*pubmatic.com*",
+    "*rubiconproject.com*", "*openx.net*", "*moatads.com*", "*adsafeprotected.com*",
+    "*permutive.com*", "*newrelic.com*", "*nr-data.net*", "*cdn.cookielaw.org*",
+]
+
+# Third-party embeds that only add weight to an article page
+EMBED_PATTERNS = [
+    "*youtube.com/embed*", "*player.vimeo.com*", "*platform.twitter.com*",
+    "*connect.facebook.net*", "*disqus.com*", "*instagram.com/embed*",
+]
+
+# Each profile lists what a driver should not download. Stylesheets and
+# first-party scripts are always kept: innerText depends on CSS and the
+# social sites render follower counts client-side.
+PROFILES = {
+    # Article and listing scraping: text only
+    "text": {
+        "block_images": True,
+        "blocked_urls": IMAGE_PATTERNS + MEDIA_PATTERNS + FONT_PATTERNS + TRACKER_PATTERNS + EMBED_PATTERNS,
+    },
+    # Follower counts on social sites, which load their own widgets
+    "minimal": {
+        "block_images": True,
+        "blocked_urls": IMAGE_PATTERNS + MEDIA_PATTERNS + FONT_PATTERNS + TRACKER_PATTERNS,
+    },
+    # Everything, for debugging a page that breaks under the other profiles
+    "full": {
+        "block_images": False,
+        "blocked_urls": [],
+    },
+}
+
+
+def apply_profile_options(options, profile="text"):
+    """Add the Chrome options for ``profile`` before the driver starts.
+
+    Images are turned off through content settings as well, which also
+    catches images served without a file extension.
+    """
+    settings = PROFILES[profile]
+    if settings["block_images"]:
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        options.add_argument("--blink-settings=imagesEnabled=false")
+    if settings["blocked_urls"]:
+        options.add_argument("--autoplay-policy=user-gesture-required")
+        options.add_argument("--mute-audio")
+    return options
+
+
+def apply_profile(driver, profile="text", extra_blocked=None):
+    """Block the profile's URL patterns in a running driver via CDP.
+
+    ``extra_blocked`` adds caller-specific patterns. The block list stays
+    on the driver's tab across navigations, so pooled drivers only need
+    this once after they start.
+    """
+    patterns = PROFILES[profile]["blocked_urls"] + list(extra_blocked or [])
+    if not patterns:
+        return driver
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except WebDriverException as e:
+        logger.warning(f"Could not apply {profile} browser profile: {str(e)}")
+    return driver
@@ -0,0 +1,222 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+
+def _kill_tree(process, timeout=3):
+    """Terminate a process and all of its descendants, killing any that linger."""
+    try:
+        processes = process.children(recursive=True) + [process]
+    except psutil.NoSuchProcess:
+        return 0
+    for proc in processes:
+        try:
+            proc.terminate()
+        except psutil.NoSuchProcess:
+            pass
+    _, alive = psutil.wait_procs(processes, timeout=timeout)
+    for proc in alive:
+        try:
+            proc.kill()
+        except psutil.NoSuchProcess:
+            pass
+    return len(processes)
+
+
+def _is_automation_browser(proc):
+    """True for chromedriver and headless Chrome processes; a desktop Chrome is left alone."""
+    name = proc.name().lower()
+    if "chromedriver" in name:
+        return True
+    if "chrome" in name or "chromium" in name:
+        return any(arg.startswith("--headless") for arg in proc.cmdline())
+    return False
+
+
+class ChromeWatchdog:
+    """Keeps track of the Chrome drivers a process launches and cleans up after them.
+
+    Drivers started through ``launch()`` (or ``session()``) are tracked by
+    their chromedriver process. ``should_recycle()`` tells a pool to retire
+    a driver once it has served ``max_pages`` pages or its process tree uses
+    more than ``max_rss_mb`` of resident memory, and ``quit()`` makes sure
+    the whole tree is gone even when ``driver.quit()`` fails.
+
+    ``reap_orphans()`` kills chromedriver and headless Chrome trees left
+    behind by processes that died without quitting them (their parent is
+    gone or they were reparented to init). ``start()`` runs it periodically
+    in a background thread and logs ``metrics()`` each time.
+    """
+
+    def __init__(self, max_pages=100, max_rss_mb=1536, interval=300):
+        self.max_pages = max_pages
+        self.max_rss_bytes = max_rss_mb * 1024 * 1024
+        self.interval = interval
+        self.recycled = 0
+        self.reaped = 0
+        self._lock = threading.Lock()
+        self._drivers = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def launch(self, factory):
+        """Start a driver with ``factory`` and track it."""
+        driver = factory()
+        self.track(driver)
+        return driver
+
+    def track(self, driver):
+        pid = self._service_pid(driver)
+        with self._lock:
+            self._drivers[id(driver)] = {"pid": pid, "pages": 0, "started_at": time.time()}
+        return driver
+
+    def page_done(self, driver):
+        with self._lock:
+            entry = self._drivers.get(id(driver))
+            if entry:
+                entry["pages"] += 1
+
+    def should_recycle(self, driver):
+        """True once a driver has served too many pages or grown too large."""
+        with self._lock:
+            entry = self._drivers.get(id(driver))
+        if not entry:
+            return False
+        if entry["pages"] >= self.max_pages:
+            reason = f"{entry['pages']} pages"
+        else:
+            rss = self._tree_rss(entry["pid"])
+            if rss <= self.max_rss_bytes:
+                return False
+            reason = f"{rss / (1024 * 1024):.0f} MB RSS"
+        logger.info(f"Recycling Chrome after {reason}")
+        with self._lock:
+            self.recycled += 1
+        return True
+
+    def quit(self, driver):
+        """Quit a driver and kill anything left of its process tree."""
+        with self._lock:
+            entry = self._drivers.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Error quitting driver: {str(e)}")
+        if entry and entry["pid"]:
+            try:
+                process = psutil.Process(entry["pid"])
+                if process.status() == psutil.STATUS_ZOMBIE:
+                    return
+            except psutil.NoSuchProcess:
+                return
+            killed = _kill_tree(process)
+            logger.warning(f"Killed {killed} Chrome process(es) left after quit")
+
+    @contextmanager
+    def session(self, factory):
+        """One tracked driver for the length of a ``with`` block, always quit afterwards."""
+        driver = self.launch(factory)
+        try:
+            yield driver
+        finally:
+            self.quit(driver)
+
+    def reap_orphans(self):
+        """Kill chromedriver/headless Chrome trees whose owning process has gone away."""
+        tracked = {entry["pid"] for entry in self._snapshot()}
+        try:
+            username = psutil.Process().username()
+        except psutil.Error:
+            username = None
+        reaped = 0
+        for proc in psutil.process_iter(["pid", "ppid", "username"]):
+            try:
+                if proc.pid in tracked or proc.info["username"] != username:
+                    continue
+                if not _is_automation_browser(proc):
+                    continue
+                ppid = proc.info["ppid"]
+                # Still owned by a live process: this one, a driver, a browser or another scraper
+                if ppid == os.getpid() or (ppid > 1 and psutil.pid_exists(ppid)):
+                    continue
+                reaped += _kill_tree(proc)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+        if reaped:
+            logger.warning(f"Reaped {reaped} orphaned Chrome process(es)")
+            with self._lock:
+                self.reaped += reaped
+        return reaped
+
+    def metrics(self):
+        """Live browser count, their total RSS and lifetime recycle/reap counters."""
+        entries = self._snapshot()
+        rss = sum(self._tree_rss(entry["pid"]) for entry in entries)
+        return {
+            "browsers": len(entries),
+            "rss_bytes": rss,
+            "pages": sum(entry["pages"] for entry in entries),
+            "recycled": self.recycled,
+            "reaped": self.reaped,
+        }
+
+    def start(self):
+        """Reap orphans now and then every ``interval`` seconds in a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.reap_orphans()
+        self._thread = threading.Thread(target=self._run, name="chrome-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.reap_orphans()
+                metrics = self.metrics()
+                logger.info(
+                    f"Chrome: {metrics['browsers']} live, {metrics['rss_bytes'] / (1024 * 1024):.0f} MB RSS, "
+                    f"{metrics['recycled']} recycled, {metrics['reaped']} orphans reaped"
+                )
+            except Exception as e:
+                logger.error(f"Chrome watchdog check failed: {str(e)}")
+
+    def _snapshot(self):
+        with self._lock:
+            return [dict(entry) for entry in self._drivers.values()]
+
+    @staticmethod
+    def _service_pid(driver):
+        try:
+            return driver.service.process.pid
+        except AttributeError:
+            return None
+
+    @staticmethod
+    def _tree_rss(pid):
+        if not pid:
+            return 0
+        try:
+            process = psutil.Process(pid)
+            processes = [process] + process.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return 0
+        total = 0
+        for proc in processes:
+            try:
+                total += proc.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        return total
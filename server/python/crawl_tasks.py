@@ -0,0 +1,303 @@
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from urllib.parse import urlparse
+
+import redis
+from celery import Celery, chain
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "ai_web"))
+from AiScraper import (
+    crawl_index, feed_discovery, scrape_website, scrape_paragraphs, build_article_data,
+    PER_HOST_RATE, MAX_RETRIES, FAILURE_THRESHOLD
+)
+from circuit_breaker import TransientFetchError, backoff_delay
+from crawl_index import canonicalize_url
+from near_dup import NearDuplicateIndex
+from result_writer import ResultWriter
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = "redis://localhost:6379/0"
+
+app = Celery("crawl_tasks", broker=REDIS_URL, backend=REDIS_URL)
+app.conf.update(
+    task_routes={"crawl_tasks.*": {"queue": "scrape_queue"}},
+    # Page fetches are slow and uneven; hand out one at a time and requeue on worker loss
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+    task_compression="gzip",
+)
+
+redis_client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+
+# Keys expire a day after the last write so abandoned crawls clean themselves up
+CRAWL_TTL = 24 * 60 * 60
+HOST_COOLDOWN = 30  # seconds a host is paused after FAILURE_THRESHOLD failures in a row
+MONITOR_INTERVAL = 15
+
+# Grants a request slot for a host if its next slot is due, otherwise returns
+# the seconds to wait. Uses Redis' clock so every worker node agrees on time.
+_HOST_GATE = redis_client.register_script("""
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local failures = tonumber(redis.call('GET', KEYS[2]) or '0')
+if failures >= tonumber(ARGV[2]) then
+    return tostring(math.max(redis.call('TTL', KEYS[2]), 1))
+end
+local next_at = tonumber(redis.call('GET', KEYS[1]) or '0')
+if next_at > now then
+    return tostring(next_at - now)
+end
+redis.call('SET', KEYS[1], tostring(now + tonumber(ARGV[1])), 'EX', 3600)
+return '0'
+""")
+
+
+def _key(crawl_id, name):
+    return f"crawl:{crawl_id}:{name}"
+
+
+def _host(url):
+    return urlparse(url).netloc
+
+
+def _incr(crawl_id, field, amount=1):
+    stats_key = _key(crawl_id, "stats")
+    pipe = redis_client.pipeline()
+    pipe.hincrby(stats_key, field, amount)
+    pipe.expire(stats_key, CRAWL_TTL)
+    pipe.execute()
+
+
+def _wait_for_host(url):
+    """Seconds until this worker may hit the URL's host; 0 means go now."""
+    host = _host(url)
+    wait = float(_HOST_GATE(
+        keys=[f"crawl:host:{host}:next", f"crawl:host:{host}:failures"],
+        args=[1 / PER_HOST_RATE, FAILURE_THRESHOLD],
+    ))
+    # Spread retries a little so a queue of jobs for one host does not wake up together
+    return wait + backoff_delay(0, base=0.5) if wait > 0 else 0
+
+
+def _host_failed(url):
+    failures_key = f"crawl:host:{_host(url)}:failures"
+    pipe = redis_client.pipeline()
+    pipe.incr(failures_key)
+    pipe.expire(failures_key, HOST_COOLDOWN)
+    pipe.execute()
+
+
+def _host_ok(url):
+    redis_client.delete(f"crawl:host:{_host(url)}:failures")
+
+
+def _retry_failure(task, error, failures):
+    """Retry a task after a failure with backoff, counting failures apart from politeness waits."""
+    retry_after = error.retry_after if isinstance(error, TransientFetchError) else None
+    kwargs = dict(task.request.kwargs, failures=failures + 1)
+    return task.retry(exc=error, kwargs=kwargs, countdown=backoff_delay(failures, retry_after=retry_after))
+
+
+@app.task(bind=True)
+def start_crawl(self, websites, crawl_id=None, backfill=False):
+    """Coordinator: queue every listing page and start the progress monitor."""
+    crawl_id = crawl_id or uuid.uuid4().hex[:12]
+    sources = [(url, category) for category, urls in websites.items() for url in urls]
+    redis_client.hset(_key(crawl_id, "stats"), mapping={
+        "started_at": time.time(),
+        "listings_total": len(sources),
+        "listings_done": 0,
+        "articles_queued": 0,
+        "articles_done": 0,
+        "articles_failed": 0,
+    })
+    redis_client.expire(_key(crawl_id, "stats"), CRAWL_TTL)
+    for url, category in sources:
+        discover_listing.delay(crawl_id, url, category, backfill)
+    monitor_crawl.apply_async((crawl_id,), countdown=MONITOR_INTERVAL)
+    logger.info(f"Crawl {crawl_id}: queued {len(sources)} listing pages")
+    return crawl_id
+
+
+# Tasks retry without limit while waiting on a host's rate; failures are capped at MAX_RETRIES
+@app.task(bind=True, max_retries=None)
+def discover_listing(self, crawl_id, url, category, backfill=False, failures=0):
+    """Enumerate a listing source and queue each article link not seen in this crawl."""
+    wait = _wait_for_host(url)
+    if wait:
+        raise self.retry(countdown=wait)
+    listed_at = time.time()
+    try:
+        items = scrape_website(url, category, backfill=backfill)
+        _host_ok(url)
+    except Exception as e:
+        _host_failed(url)
+        if failures < MAX_RETRIES:
+            raise _retry_failure(self, e, failures)
+        logger.error(f"Crawl {crawl_id}: giving up on listing {url}: {str(e)}")
+        items = []
+    else:
+        redis_client.hset(_key(crawl_id, "sources"), url, listed_at)
+
+    queued = 0
+    seen_key = _key(crawl_id, "seen")
+    for item in items:
+        redis_client.rpush(_key(crawl_id, "listings"), json.dumps(item))
+        # SADD is atomic, so only one worker queues each canonical link
+        canonical = canonicalize_url(item["link"])
+        if not redis_client.sadd(seen_key, canonical):
+            continue
+        try:
+            # Articles fetched recently and not yet due again are replayed from the crawl index
+            cached = crawl_index.fresh_record(item["link"])
+            if cached:
+                cached["category"] = item["category"]
+                persist_article.apply_async((cached, crawl_id, url), link_error=article_failed.s(crawl_id, url))
+            else:
+                chain(
+                    fetch_article.s(crawl_id, item["link"]),
+                    extract_article_task.s(crawl_id, item),
+                    persist_article.s(crawl_id, url),
+                ).on_error(article_failed.s(crawl_id, url)).delay()
+        except Exception as e:
+            # Not queued, so let a later listing page try it again
+            redis_client.srem(seen_key, canonical)
+            redis_client.sadd(_key(crawl_id, "failed_sources"), url)
+            logger.error(f"Crawl {crawl_id}: could not queue {item['link']}: {str(e)}")
+            continue
+        _incr(crawl_id, "articles_queued")
+        queued += 1
+    for key in (seen_key, _key(crawl_id, "listings"), _key(crawl_id, "sources"), _key(crawl_id, "failed_sources")):
+        redis_client.expire(key, CRAWL_TTL)
+    _incr(crawl_id, "listings_done")
+    logger.info(f"Crawl {crawl_id}: {len(items)} articles on {url} ({queued} new)")
+    return queued
+
+
+@app.task(bind=True, max_retries=None)
+def fetch_article(self, crawl_id, url, failures=0):
+    """Scrape an article the way AiScraper does: over HTTP, falling back to Chrome.
+
+    Snapshots, selector stats and fetch modes are recorded by scrape_paragraphs.
+    """
+    wait = _wait_for_host(url)
+    if wait:
+        raise self.retry(countdown=wait)
+    try:
+        result = scrape_paragraphs(url)
+        _host_ok(url)
+        return result
+    except Exception as e:
+        _host_failed(url)
+        if failures < MAX_RETRIES:
+            raise _retry_failure(self, e, failures)
+        logger.error(f"Crawl {crawl_id}: giving up on {url}: {str(e)}")
+        crawl_index.record_failure(url)
+        return None
+
+
+@app.task
+def extract_article_task(result, crawl_id, item):
+    """Turn a scraped article into its record, or None if nothing usable was found."""
+    if not result:
+        return None
+    try:
+        if not result["content"]:
+            crawl_index.record_failure(item["link"], status="empty")
+            return None
+        record = build_article_data(item, result)
+        crawl_index.record_success(item["link"], record)
+        return record
+    except Exception as e:
+        # Returning None lets persist_article count the failure so the crawl can finish
+        logger.error(f"Crawl {crawl_id}: could not build {item['link']}: {str(e)}")
+        return None
+
+
+@app.task
+def persist_article(record, crawl_id, source_url=None):
+    """Append a finished article to the crawl's result list in Redis."""
+    if record is None:
+        _article_failed(crawl_id, source_url)
+        return False
+    articles_key = _key(crawl_id, "articles")
+    redis_client.rpush(articles_key, json.dumps(record))
+    redis_client.expire(articles_key, CRAWL_TTL)
+    _incr(crawl_id, "articles_done")
+    return True
+
+
+@app.task
+def article_failed(request, exc, traceback, crawl_id, source_url=None):
+    """Errback for an article chain that raised, so monitor_crawl still sees it finish."""
+    logger.error(f"Crawl {crawl_id}: article task {request.id} failed: {exc!r}")
+    _article_failed(crawl_id, source_url)
+
+
+def _article_failed(crawl_id, source_url):
+    _incr(crawl_id, "articles_failed")
+    if source_url:
+        # Its feed is listed from the same point next run, so the article is retried
+        redis_client.sadd(_key(crawl_id, "failed_sources"), source_url)
+
+
+@app.task(bind=True, max_retries=None)
+def monitor_crawl(self, crawl_id, output_dir="output"):
+    """Coordinator: log progress and write the dataset once every task has finished."""
+    stats = {key: float(value) for key, value in redis_client.hgetall(_key(crawl_id, "stats")).items()}
+    if not stats:
+        logger.error(f"Crawl {crawl_id}: no state in Redis, it may have expired")
+        return None
+    finished = stats.get("articles_done", 0) + stats.get("articles_failed", 0)
+    logger.info(
+        f"Crawl {crawl_id}: {int(stats.get('listings_done', 0))}/{int(stats['listings_total'])} listings, "
+        f"{int(finished)}/{int(stats.get('articles_queued', 0))} articles "
+        f"({int(stats.get('articles_failed', 0))} failed)"
+    )
+    if stats.get("listings_done", 0) < stats["listings_total"] or finished < stats.get("articles_queued", 0):
+        raise self.retry(countdown=MONITOR_INTERVAL)
+    _mark_sources_listed(crawl_id)
+    return assemble_dataset(crawl_id, os.path.join(output_dir, f"crawl_{crawl_id}"))
+
+
+def _mark_sources_listed(crawl_id):
+    """Move each listed source's feed mark forward unless one of its articles failed."""
+    failed = redis_client.smembers(_key(crawl_id, "failed_sources"))
+    for url, listed_at in redis_client.hgetall(_key(crawl_id, "sources")).items():
+        if url not in failed:
+            feed_discovery.mark_listed(url, float(listed_at))
+
+
+def assemble_dataset(crawl_id, output_dir):
+    """Write the crawl's listings and articles with the usual ResultWriter outputs."""
+    writer = ResultWriter(output_dir, dedup=NearDuplicateIndex())
+    try:
+        for listing in redis_client.lrange(_key(crawl_id, "listings"), 0, -1):
+            writer.add_listing(json.loads(listing))
+        for article in redis_client.lrange(_key(crawl_id, "articles"), 0, -1):
+            writer.add_article(json.loads(article))
+    finally:
+        writer.close()
+    summary = {
+        "crawl_id": crawl_id,
+        "output_dir": output_dir,
+        "listings": writer.listings.count,
+        "articles": writer.articles.count,
+        "duplicates": writer.duplicates,
+        "categories": writer.category_counts,
+    }
+    redis_client.hset(_key(crawl_id, "stats"), "finished_at", time.time())
+    logger.info(f"Crawl {crawl_id} finished: {summary}")
+    return summary
+
+
+if __name__ == "__main__":
+    # Queue a crawl of the sources in scraper_config.json; workers on scrape_queue do the rest
+    with open(sys.argv[1] if len(sys.argv) > 1 else "scraper_config.json", 'r') as f:
+        config = json.load(f)
+    print(start_crawl.delay(config["websites"], backfill=config.get("backfill", False)).get(timeout=30))
@@ -0,0 +1,215 @@
+import datetime
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+# Deletes a lock only if it still holds our token, so a slow refresh cannot free someone else's lock
+_RELEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class FollowerCache:
+    """Redis cache of follower counts per platform and handle, served stale-while-revalidate.
+
+    ``get()`` returns a cached count at once. Counts younger than
+    ``fresh_ttl`` seconds are returned as they are. Older ones are returned
+    marked stale while one background refresh runs. Entries expire from
+    Redis after ``stale_ttl``, and a miss scrapes before returning.
+
+    Refreshes are single-flight. Threads in one process share a single
+    future, and processes share a Redis lock. Callers that lose the race
+    wait for the winner's value instead of starting their own scrape, so a
+    platform and handle never have more than one scrape in flight.
+
+    ``get_many()`` reads several platforms within a latency budget and
+    labels each entry live, cached or missing.
+    """
+
+    def __init__(self, redis_client, fresh_ttl=15 * 60, stale_ttl=7 * 24 * 60 * 60,
+                 lock_ttl=120, max_refreshes=5, prefix="followers"):
+        self.redis = redis_client
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.lock_ttl = lock_ttl
+        self.prefix = prefix
+        self._release = redis_client.register_script(_RELEASE)
+        self._executor = ThreadPoolExecutor(max_workers=max_refreshes, thread_name_prefix="follower-refresh")
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def get(self, platform, handle, fetch):
+        """Follower entry for ``handle`` on ``platform``, scraping with ``fetch(handle)`` when needed.
+
+        Returns ``{"followers", "fetched_at", "stale"}``. Errors from
+        ``fetch`` are raised only when there is no cached value to fall back on.
+        """
+        cached = self.peek(platform, handle)
+        if cached is None:
+            return self._refresh(platform, handle, fetch)
+        if cached["stale"]:
+            self.refresh_async(platform, handle, fetch)
+        return cached
+
+    def get_many(self, tasks, budget=None, fallback=None):
+        """Entries for ``{platform: (fetch, handle)}``, returned within ``budget`` seconds.
+
+        Cached counts come back at once as "cached", and stale ones are
+        refreshed in the background. Misses are scraped in parallel, and
+        those done by the deadline are "live". The rest keep running so
+        they warm the cache for the next call. Until then they are answered
+        from ``fallback(platform, handle)`` (the last known good
+        ``{"followers", "fetched_at"}``) as stale "cached" entries, or as
+        "missing" with no count.
+        """
+        deadline = time.monotonic() + budget if budget is not None else None
+        entries = {}
+        pending = {}
+        for platform, (fetch, handle) in tasks.items():
+            cached = self.peek(platform, handle)
+            if cached is None:
+                pending[platform] = self.refresh(platform, handle, fetch)
+                continue
+            if cached["stale"]:
+                self.refresh_async(platform, handle, fetch)
+            entries[platform] = dict(cached, status="cached")
+
+        if pending:
+            wait(pending.values(), timeout=None if deadline is None else max(deadline - time.monotonic(), 0))
+        for platform, future in pending.items():
+            handle = tasks[platform][1]
+            if future.done() and future.exception() is None:
+                entries[platform] = dict(future.result(), status="live")
+                continue
+            if future.done():
+                logger.warning(f"Scraping {platform}/{handle} followers failed: {str(future.exception())}")
+            else:
+                logger.info(f"{platform}/{handle} followers missed the {budget}s budget; finishing in background")
+            entries[platform] = self._last_known(platform, handle, fallback)
+        return entries
+
+    def _last_known(self, platform, handle, fallback):
+        last = None
+        if fallback is not None:
+            try:
+                last = fallback(platform, handle)
+            except Exception as e:
+                logger.warning(f"No last known {platform}/{handle} followers: {str(e)}")
+        if last is None:
+            return {"followers": None, "fetched_at": None, "stale": True, "status": "missing"}
+        return {"followers": last["followers"], "fetched_at": last["fetched_at"], "stale": True, "status": "cached"}
+
+    def peek(self, platform, handle):
+        """Cached entry without triggering a scrape, or None."""
+        try:
+            raw = self.redis.get(self._key(platform, handle))
+        except Exception as e:
+            logger.warning(f"Follower cache read failed for {platform}/{handle}: {str(e)}")
+            return None
+        if raw is None:
+            return None
+        value = json.loads(raw)
+        return self._entry(value["followers"], value["fetched_at"])
+
+    def set(self, platform, handle, followers, fetched_at=None):
+        """Store a count, e.g. from a scheduled snapshot, and return its entry."""
+        fetched_at = fetched_at or time.time()
+        try:
+            self.redis.set(self._key(platform, handle),
+                           json.dumps({"followers": followers, "fetched_at": fetched_at}),
+                           ex=self.stale_ttl)
+        except Exception as e:
+            logger.warning(f"Follower cache write failed for {platform}/{handle}: {str(e)}")
+        return self._entry(followers, fetched_at)
+
+    def refresh(self, platform, handle, fetch, executor=None):
+        """Scrape now on a refresh thread; returns a future of the new entry.
+
+        Joins a refresh of the same key already running here or in another
+        process. Bulk callers pass their own ``executor`` so their queue does
+        not hold up the cache's pool, which serves request-time misses.
+        """
+        return (executor or self._executor).submit(self._refresh, platform, handle, fetch)
+
+    def refresh_async(self, platform, handle, fetch):
+        """Start a background refresh unless one is already running in this process."""
+        key = self._key(platform, handle)
+        with self._lock:
+            if key in self._inflight:
+                return
+        self._executor.submit(self._background_refresh, platform, handle, fetch)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    def _background_refresh(self, platform, handle, fetch):
+        try:
+            self._refresh(platform, handle, fetch)
+        except Exception as e:
+            logger.error(f"Background refresh of {platform}/{handle} followers failed: {str(e)}")
+
+    def _refresh(self, platform, handle, fetch):
+        """Scrape once per key: join a refresh already running here, else take the Redis lock."""
+        key = self._key(platform, handle)
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            result = self._refresh_locked(platform, handle, fetch)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _refresh_locked(self, platform, handle, fetch):
+        key = self._key(platform, handle)
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        previous = self.peek(platform, handle)
+        deadline = time.monotonic() + self.lock_ttl
+        while True:
+            if self.redis.set(lock_key, token, nx=True, ex=self.lock_ttl):
+                try:
+                    followers = fetch(handle)
+                    if followers is None:
+                        raise ValueError(f"No {platform} follower count for {handle}")
+                    return self.set(platform, handle, followers)
+                finally:
+                    self._release(keys=[lock_key], args=[token])
+            # Another process is scraping this handle; use its result once it lands
+            time.sleep(0.2)
+            current = self.peek(platform, handle)
+            if current is not None and (previous is None or current["fetched_at"] != previous["fetched_at"]):
+                return current
+            if time.monotonic() > deadline:
+                if previous is not None:
+                    return previous
+                raise TimeoutError(f"Timed out waiting for another refresh of {platform}/{handle}")
+
+    def _entry(self, followers, fetched_at):
+        return {
+            "followers": followers,
+            "fetched_at": datetime.datetime.fromtimestamp(fetched_at).isoformat(),
+            "stale": time.time() - fetched_at > self.fresh_ttl,
+        }
+
+    def _key(self, platform, handle):
+        return f"{self.prefix}:{platform}:{handle.lower()}"
@@ -0,0 +1,386 @@
+import collections
+import datetime
+import functools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import WebDriverException
+
+from browser_profiles import apply_profile
+
+logger = logging.getLogger(__name__)
+
+
+def parse_number(text):
+    text = text.replace("FOLLOWERS", '')
+    text = text.replace("followers", '')
+    text = text.replace(",", '')
+    if 'K' in text:
+        text = int(text.replace('K',''))
+        return text * 1000
+    else:
+        text = int(text)
+        return text
+
+
+# Profile page and follower-count element for each platform, plus how to read the number
+FOLLOWER_PAGES = {
+    'instagram': {
+        "url": "https://www.instagram.com/{handle}/",
+        "xpath": "//div/div/div[2]/div/div/div[1]/div[2]/div/div[1]/section/main/div/header/section/div[2]/ul/li[2]/div/button/span/span",
+        "parse": lambda text: int(text.replace(",", '')),
+    },
+    'facebook': {
+        "url": "https://www.facebook.com/{handle}",
+        "xpath": "//div/div[1]/div/div[3]/div/div/div[1]/div[1]/div/div/div[1]/div[2]/div/div/div/div[3]/div/div/div[2]/span/a[2]",
+        "parse": parse_number,
+    },
+    'linkedin': {
+        "url": "https://www.linkedin.com/company/{handle}",
+        "xpath": "//section[1]/section/div/div[2]/div[1]/h3",
+        "parse": lambda text: parse_number(text.replace("Rockville, MD", '')),
+    },
+    'twitch': {
+        "url": "https://twitch.tv/{handle}/about",
+        "xpath": "//div[3]/div/div/div/div[1]/div[2]/div/div/div[2]/div/div[1]/div/div/div/span/div/div/span",
+        "parse": parse_number,
+    },
+    'youtube': {
+        "url": "https://www.youtube.com/c/{handle}",
+        "xpath": "//yt-page-header-renderer/yt-page-header-view-model/div/div[1]/div/yt-content-metadata-view-model/div[2]/span[1]",
+        "parse": lambda text: parse_number(text.replace("subscribers", '')),
+    },
+}
+
+# Most profile lookups per second started against each platform by collect_batch
+PLATFORM_RATES = {
+    'instagram': 0.5,
+    'facebook': 0.5,
+    'linkedin': 0.25,
+    'twitch': 1.0,
+    'youtube': 1.0,
+}
+
+
+def normalize_handle(handle):
+    return handle.strip().strip("/").lstrip("@").lower()
+
+
+def account_from_link(link):
+    """(platform, handle) for a profile URL such as a competitor's social_media_link, or None."""
+    parsed = urlparse(link if "//" in link else f"https://{link}")
+    host = parsed.netloc.lower()
+    parts = [part for part in parsed.path.split("/") if part]
+    if not parts:
+        return None
+    if host.endswith("instagram.com"):
+        return ('instagram', normalize_handle(parts[0]))
+    if host.endswith("facebook.com"):
+        return ('facebook', normalize_handle(parts[0]))
+    if host.endswith("linkedin.com") and parts[0] == "company" and len(parts) > 1:
+        return ('linkedin', normalize_handle(parts[1]))
+    if host.endswith("twitch.tv"):
+        return ('twitch', normalize_handle(parts[0]))
+    if host.endswith("youtube.com"):
+        if parts[0] in ("c", "user") and len(parts) > 1:
+            return ('youtube', normalize_handle(parts[1]))
+        if parts[0].startswith("@"):
+            return ('youtube', normalize_handle(parts[0]))
+    return None
+
+
+def collect_batch(collector, accounts, cache=None, rates=None, max_in_flight=None, timeout=None):
+    """Yield follower results for many (platform, handle) pairs as they complete.
+
+    Pairs are deduplicated case-insensitively. Fresh counts in ``cache``
+    (a ``FollowerCache``) are yielded first without a scrape. The rest are
+    fed to ``collector`` no faster than ``rates`` (lookups per second per
+    platform, default ``PLATFORM_RATES``), with at most ``max_in_flight``
+    lookups outstanding (default: the collector's tab limit). However long
+    the list, one browser with that many tabs does all the work. With a
+    ``cache``, lookups go through its single-flight refresh, so a handle
+    already being scraped by the API or another worker is not scraped twice,
+    and the counts are written back to it. Those refreshes run on the batch's
+    own threads, never in the pool that answers ``/followers`` misses.
+
+    Each result is ``{"platform", "handle", "followers", "fetched_at",
+    "status"}``, with status "cached", "live" or "error"; errors also
+    carry an "error" message.
+    """
+    rates = rates or PLATFORM_RATES
+    max_in_flight = max_in_flight or collector.max_tabs
+    unique = []
+    seen = set()
+    for platform, handle in accounts:
+        account = (platform, normalize_handle(handle))
+        if account[1] and account not in seen:
+            seen.add(account)
+            unique.append(account)
+
+    # One queue per platform, taken round-robin so a slow platform does not hold up the others
+    waiting = collections.OrderedDict()
+    for platform, handle in unique:
+        if platform not in FOLLOWER_PAGES:
+            yield {"platform": platform, "handle": handle, "followers": None, "fetched_at": None,
+                   "status": "error", "error": f"Unsupported platform: {platform}"}
+            continue
+        if cache is not None:
+            cached = cache.peek(platform, handle)
+            if cached is not None and not cached["stale"]:
+                yield {"platform": platform, "handle": handle, "followers": cached["followers"],
+                       "fetched_at": cached["fetched_at"], "status": "cached"}
+                continue
+        waiting.setdefault(platform, collections.deque()).append(handle)
+
+    next_start = collections.defaultdict(float)
+    in_flight = {}
+    executor = None
+    if cache is not None and waiting:
+        executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="follower-batch")
+    try:
+        while waiting or in_flight:
+            now = time.monotonic()
+            for platform in list(waiting):
+                if len(in_flight) >= max_in_flight:
+                    break
+                if next_start[platform] > now:
+                    continue
+                handle = waiting[platform].popleft()
+                if not waiting[platform]:
+                    del waiting[platform]
+                if cache is not None:
+                    fetch = functools.partial(collector.collect_one, platform, timeout=timeout)
+                    future = cache.refresh(platform, handle, fetch, executor=executor)
+                else:
+                    future = collector.submit(platform, handle, timeout)
+                in_flight[future] = (platform, handle)
+                next_start[platform] = now + 1 / rates.get(platform, 1.0)
+
+            # Wake up for the first finished lookup or the next platform coming off its rate limit
+            delay = None
+            if waiting and len(in_flight) < max_in_flight:
+                delay = max(min(next_start[platform] for platform in waiting) - time.monotonic(), 0)
+            if not in_flight:
+                time.sleep(delay or 0)
+                continue
+            done, _ = wait(in_flight, timeout=delay, return_when=FIRST_COMPLETED)
+            for future in done:
+                platform, handle = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    yield {"platform": platform, "handle": handle, "followers": None, "fetched_at": None,
+                           "status": "error", "error": str(e)}
+                    continue
+                if cache is not None:
+                    followers, fetched_at = result["followers"], result["fetched_at"]
+                else:
+                    followers, fetched_at = result, datetime.datetime.now().isoformat()
+                yield {"platform": platform, "handle": handle, "followers": followers,
+                       "fetched_at": fetched_at, "status": "live"}
+    finally:
+        # The caller stopped reading (e.g. the client went away); drop lookups not yet started
+        for future in in_flight:
+            future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+class _Tab:
+    def __init__(self, platform, handle, future, timeout):
+        self.platform = platform
+        self.handle = handle
+        self.future = future
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout
+        self.window = None
+        self.last_value = None
+
+
+class FollowerCollector:
+    """Reads follower counts from one long-lived Chrome, one tab per request.
+
+    ``submit()`` queues a (platform, handle) lookup and returns a future. A
+    single worker thread owns the browser: it opens a tab for each queued
+    lookup (up to ``max_tabs`` at once), starts the navigation without
+    waiting for it, and then polls the open tabs in turn, so the pages all
+    load at the same time. A count is accepted once it reads the same on two
+    polls in a row, and the tab is closed.
+
+    The browser is started on first use (or by ``start()``) and kept between
+    lookups. It is replaced if it breaks or ``watchdog.should_recycle()``
+    says it has grown too large. Pass a ``ChromeWatchdog`` so it is tracked
+    and its process tree is cleaned up.
+    """
+
+    def __init__(self, factory, watchdog=None, profile="minimal", timeout=15, max_tabs=5, poll_interval=0.25):
+        self.factory = factory
+        self.watchdog = watchdog
+        self.profile = profile
+        self.timeout = timeout
+        self.max_tabs = max_tabs
+        self.poll_interval = poll_interval
+        self._requests = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._driver = None
+        self._home = None
+
+    def submit(self, platform, handle, timeout=None):
+        """Queue a lookup; the future resolves to the follower count or raises."""
+        if platform not in FOLLOWER_PAGES:
+            raise ValueError(f"Unsupported platform: {platform}")
+        future = Future()
+        self._requests.put((platform, handle, future, timeout or self.timeout))
+        self.start(warm=False)
+        return future
+
+    def collect_one(self, platform, handle, timeout=None):
+        return self.submit(platform, handle, timeout).result()
+
+    def collect(self, accounts, timeout=None):
+        """Follower counts for ``{platform: handle}``, loaded in parallel tabs. Failures are None."""
+        futures = {platform: self.submit(platform, handle, timeout) for platform, handle in accounts.items()}
+        followers = {}
+        for platform, future in futures.items():
+            try:
+                followers[platform] = future.result()
+            except Exception as e:
+                logger.error(f"Error getting {platform} followers: {str(e)}")
+                followers[platform] = None
+        return followers
+
+    def start(self, warm=True):
+        """Start the worker thread; with ``warm`` the browser is launched right away."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="follower-collector", daemon=True)
+                self._thread.start()
+        if warm:
+            self._requests.put(None)
+
+    def close(self):
+        self._stop.set()
+        self._requests.put(None)
+        if self._thread:
+            self._thread.join(timeout=10)
+
+    def _run(self):
+        tabs = []
+        while not self._stop.is_set():
+            self._take_requests(tabs, block=not tabs)
+            if not tabs:
+                continue
+            try:
+                self._poll(tabs)
+            except WebDriverException as e:
+                logger.error(f"Follower browser failed, restarting it: {str(e)}")
+                for tab in tabs:
+                    if not tab.future.done():
+                        tab.future.set_exception(e)
+                tabs.clear()
+                self._quit_driver()
+                continue
+            if not tabs:
+                self._maybe_recycle()
+            time.sleep(self.poll_interval)
+
+        for tab in tabs:
+            if not tab.future.done():
+                tab.future.set_exception(RuntimeError("Follower collector closed"))
+        self._quit_driver()
+
+    def _take_requests(self, tabs, block):
+        while len(tabs) < self.max_tabs:
+            try:
+                request = self._requests.get(timeout=1) if block else self._requests.get_nowait()
+            except queue.Empty:
+                return
+            block = False
+            if request is None and self._stop.is_set():
+                return
+            try:
+                driver = self._ensure_driver()
+            except Exception as e:
+                logger.error(f"Could not start follower browser: {str(e)}")
+                if request:
+                    request[2].set_exception(e)
+                continue
+            if request is None:
+                continue
+            platform, handle, future, timeout = request
+            if not future.set_running_or_notify_cancel():
+                continue
+            tab = _Tab(platform, handle, future, timeout)
+            try:
+                self._open_tab(driver, tab)
+            except WebDriverException as e:
+                future.set_exception(e)
+                self._quit_driver()
+                continue
+            tabs.append(tab)
+
+    def _open_tab(self, driver, tab):
+        driver.switch_to.new_window('tab')
+        tab.window = driver.current_window_handle
+        # URL blocking is per tab, so each new one gets the profile before it navigates
+        apply_profile(driver, self.profile)
+        url = FOLLOWER_PAGES[tab.platform]["url"].format(handle=tab.handle)
+        # Assigning location returns at once, unlike driver.get, so the next tab can start loading
+        driver.execute_script("window.location.href = arguments[0];", url)
+
+    def _poll(self, tabs):
+        driver = self._driver
+        for tab in list(tabs):
+            page = FOLLOWER_PAGES[tab.platform]
+            driver.switch_to.window(tab.window)
+            value = None
+            elements = driver.find_elements(By.XPATH, page["xpath"])
+            if elements:
+                try:
+                    value = page["parse"](elements[0].text)
+                except ValueError:
+                    value = None
+            if value is not None and value == tab.last_value:
+                tab.future.set_result(value)
+            elif time.monotonic() > tab.deadline:
+                tab.future.set_exception(TimeoutError(
+                    f"No {tab.platform} follower count for {tab.handle} after {tab.timeout}s"))
+            else:
+                tab.last_value = value
+                continue
+            tabs.remove(tab)
+            driver.close()
+            if self.watchdog is not None:
+                self.watchdog.page_done(driver)
+        driver.switch_to.window(self._home)
+
+    def _ensure_driver(self):
+        if self._driver is None:
+            self._driver = self.watchdog.launch(self.factory) if self.watchdog is not None else self.factory()
+            self._home = self._driver.current_window_handle
+        return self._driver
+
+    def _maybe_recycle(self):
+        if self.watchdog is not None and self.watchdog.should_recycle(self._driver):
+            self._quit_driver()
+
+    def _quit_driver(self):
+        if self._driver is None:
+            return
+        if self.watchdog is not None:
+            self.watchdog.quit(self._driver)
+        else:
+            try:
+                self._driver.quit()
+            except Exception as e:
+                logger.warning(f"Error quitting follower browser: {str(e)}")
+        self._driver = None
+        self._home = None
@@ -0,0 +1,69 @@
+import datetime
+import logging
+import os
+import sys
+
+import redis
+from celery import Celery
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "Followers"))
+from getFollowers import ACCOUNTS, collector
+from follower_cache import FollowerCache
+from follower_collector import account_from_link, collect_batch
+from follower_store import save_snapshot, competitor_links
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = "redis://localhost:6379/0"
+
+# Every tracked account is scraped this often, however many dashboards are open
+SNAPSHOT_INTERVAL = 60 * 60
+
+app = Celery("follower_snapshots", broker=REDIS_URL, backend=REDIS_URL)
+app.conf.update(
+    task_routes={"follower_snapshots.*": {"queue": "followers_queue"}},
+    beat_schedule={
+        "snapshot-followers": {
+            "task": "follower_snapshots.snapshot_followers",
+            "schedule": SNAPSHOT_INTERVAL,
+        },
+    },
+    worker_prefetch_multiplier=1,
+)
+
+# Snapshots also refresh the /followers cache so the API rarely has to scrape itself
+follower_cache = FollowerCache(redis.Redis.from_url(REDIS_URL, decode_responses=True))
+
+
+def tracked_accounts():
+    """(platform, handle) pairs to snapshot: our own accounts and every competitor's."""
+    accounts = list(ACCOUNTS.items())
+    for link in competitor_links():
+        account = account_from_link(link)
+        if account is None:
+            logger.info(f"No follower scraper for competitor link {link}")
+            continue
+        accounts.append(account)
+    return accounts
+
+
+@app.task
+def snapshot_followers():
+    """Scrape every tracked account and store the counts as one snapshot.
+
+    Counts the API scraped in the last few minutes are reused from the cache.
+    """
+    accounts = tracked_accounts()
+    captured_at = datetime.datetime.now()
+    rows = []
+    for result in collect_batch(collector, accounts, cache=follower_cache):
+        if result["followers"] is None:
+            # Scrape failed; skip it rather than store a 0 that looks like a real count
+            logger.error(f"Snapshot of {result['platform']}/{result['handle']} followers failed: "
+                         f"{result.get('error')}")
+            continue
+        rows.append((result["platform"], result["handle"], result["followers"]))
+
+    saved = save_snapshot(rows, captured_at)
+    logger.info(f"Saved follower snapshot: {saved}/{len(accounts)} accounts")
+    return saved
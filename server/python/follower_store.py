@@ -0,0 +1,115 @@
+import threading
+
+import psycopg2
+from psycopg2 import pool
+from psycopg2.extras import RealDictCursor, execute_values
+
+# Database Connection Pool, shared by the snapshot worker and the follower API threads.
+# Created on first use so importers can start while Postgres is down.
+DB_POOL = None
+_pool_lock = threading.Lock()
+
+
+class DatabaseUnavailable(Exception):
+    """Postgres could not be reached; callers can retry later."""
+
+
+def _get_pool():
+    global DB_POOL
+    with _pool_lock:
+        if DB_POOL is None:
+            try:
+                DB_POOL = pool.ThreadedConnectionPool(
+                    minconn=1, maxconn=10,
+                    dbname="project_monopoly",
+                    user="root",
+                    password="secret",
+                    host="localhost",
+                    port="5432",
+                )
+            except psycopg2.OperationalError as e:
+                raise DatabaseUnavailable(f"Could not connect to the follower database: {str(e)}") from e
+        return DB_POOL
+
+def get_db_connection():
+    db_pool = _get_pool()
+    try:
+        return db_pool.getconn()
+    except psycopg2.OperationalError as e:
+        raise DatabaseUnavailable(f"Could not connect to the follower database: {str(e)}") from e
+
+def release_db_connection(conn):
+    _get_pool().putconn(conn)
+
+
+# Handles are stored lower-case, as the platforms treat them case-insensitively
+def save_snapshot(rows, captured_at=None):
+    """Bulk-insert ``(platform, handle, followers)`` rows taken in one snapshot run."""
+    if not rows:
+        return 0
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            execute_values(
+                cursor,
+                "INSERT INTO follower_counts (platform, handle, followers, captured_at) VALUES %s",
+                [(platform, handle.lower(), followers, captured_at) for platform, handle, followers in rows],
+                template="(%s, %s, %s, COALESCE(%s, NOW()))",
+            )
+        conn.commit()
+        return len(rows)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        release_db_connection(conn)
+
+
+def competitor_links():
+    """Every distinct social media link in the competitors table."""
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT DISTINCT social_media_link FROM competitors")
+            return [row[0] for row in cursor.fetchall()]
+    finally:
+        release_db_connection(conn)
+
+
+def latest_counts(platform=None, handle=None):
+    """Most recent count for every tracked account, optionally for one platform or handle."""
+    conn = get_db_connection()
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute("""
+                SELECT DISTINCT ON (platform, handle) platform, handle, followers, captured_at
+                FROM follower_counts
+                WHERE (%(platform)s IS NULL OR platform = %(platform)s)
+                  AND (%(handle)s IS NULL OR handle = %(handle)s)
+                ORDER BY platform, handle, captured_at DESC
+            """, {"platform": platform, "handle": handle.lower() if handle else None})
+            return cursor.fetchall()
+    finally:
+        release_db_connection(conn)
+
+
+def count_history(platform, handle, start=None, end=None, limit=1000):
+    """Counts for one account between ``start`` and ``end``, oldest first."""
+    conn = get_db_connection()
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute("""
+                SELECT followers, captured_at FROM (
+                    SELECT followers, captured_at
+                    FROM follower_counts
+                    WHERE platform = %(platform)s AND handle = %(handle)s
+                      AND captured_at >= COALESCE(%(start)s, '-infinity'::timestamp)
+                      AND captured_at <= COALESCE(%(end)s, 'infinity'::timestamp)
+                    ORDER BY captured_at DESC
+                    LIMIT %(limit)s
+                ) recent
+                ORDER BY captured_at
+            """, {"platform": platform, "handle": handle.lower(), "start": start, "end": end, "limit": limit})
+            return cursor.fetchall()
+    finally:
+        release_db_connection(conn)
@@ -0,0 +1,223 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Shared by every scraper under server/python unless a caller picks its own directory
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "http")
+
+
+class CachedResponse:
+    """Minimal stand-in for a requests.Response served from the cache."""
+
+    def __init__(self, url, status_code, headers, content, encoding, from_cache, revalidated=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or "utf-8"
+        self.from_cache = from_cache
+        self.revalidated = revalidated
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors="replace")
+
+
+class HttpCache:
+    """Shared on-disk HTTP response cache.
+
+    Bodies are stored as files under ``directory`` and indexed in SQLite with
+    their ETag / Last-Modified validators. ``fetch()`` serves entries younger
+    than ``max_age`` straight from disk, revalidates older ones with
+    If-None-Match / If-Modified-Since (a 304 reuses the stored body) and
+    evicts least recently used entries once the cache grows past
+    ``max_bytes``.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            os.makedirs(os.path.join(self.directory, "bodies"), exist_ok=True)
+            self._conn = sqlite3.connect(os.path.join(self.directory, "index.db"), check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content_type TEXT,
+                    encoding TEXT,
+                    size INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+            self._conn.commit()
+        return self._conn
+
+    def _key(self, url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _body_path(self, key):
+        return os.path.join(self.directory, "bodies", key[:2], key)
+
+    def lookup(self, url):
+        """Return the stored entry for a URL as a dict, or None."""
+        key = self._key(url)
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT etag, last_modified, content_type, encoding, fetched_at FROM entries WHERE key = ?",
+                (key,)
+            ).fetchone()
+        if not row:
+            return None
+        try:
+            with open(self._body_path(key), 'rb') as f:
+                content = f.read()
+        except OSError:
+            self._delete(key)
+            return None
+        etag, last_modified, content_type, encoding, fetched_at = row
+        return {
+            "key": key,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": content_type,
+            "encoding": encoding,
+            "fetched_at": fetched_at,
+            "content": content,
+        }
+
+    def fetch(self, session, url, headers=None, timeout=15, max_age=0):
+        """GET a URL through the cache and return a response-like object."""
+        entry = self.lookup(url)
+        if entry and time.time() - entry["fetched_at"] <= max_age:
+            self.hits += 1
+            self._touch(entry["key"])
+            return self._from_entry(url, entry, revalidated=False)
+
+        request_headers = dict(headers or {})
+        if entry:
+            if entry["etag"]:
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = session.get(url, headers=request_headers, timeout=timeout)
+
+        if response.status_code == 304 and entry:
+            self.revalidated += 1
+            self._refresh(entry["key"], response.headers)
+            return self._from_entry(url, entry, revalidated=True)
+
+        self.misses += 1
+        if response.status_code == 200 and "no-store" not in response.headers.get("Cache-Control", ""):
+            self.store(url, response)
+        return response
+
+    def store(self, url, response):
+        key = self._key(url)
+        body_path = self._body_path(key)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        tmp_path = f"{body_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(response.content)
+        os.replace(tmp_path, body_path)
+
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("""
+                INSERT OR REPLACE INTO entries
+                    (key, url, etag, last_modified, content_type, encoding, size, fetched_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                key, url,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                response.headers.get("Content-Type"),
+                response.encoding,
+                len(response.content),
+                now, now
+            ))
+            conn.commit()
+        self._evict()
+
+    def _from_entry(self, url, entry, revalidated):
+        headers = {"Content-Type": entry["content_type"] or ""}
+        return CachedResponse(url, 200, headers, entry["content"], entry["encoding"],
+                              from_cache=True, revalidated=revalidated)
+
+    def _touch(self, key):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+
+    def _refresh(self, key, headers):
+        """Reset an entry's age after a 304, picking up any new validators."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("""
+                UPDATE entries SET
+                    etag = COALESCE(?, etag),
+                    last_modified = COALESCE(?, last_modified),
+                    fetched_at = ?,
+                    last_used = ?
+                WHERE key = ?
+            """, (headers.get("ETag"), headers.get("Last-Modified"), now, now, key))
+            conn.commit()
+
+    def _delete(self, key):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            conn.commit()
+        try:
+            os.remove(self._body_path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is back under 90% of max_bytes."""
+        with self._lock:
+            conn = self._connection()
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            target = self.max_bytes * 0.9
+            victims = []
+            for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall():
+                if total <= target:
+                    break
+                victims.append(key)
+                total -= size
+            conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in victims])
+            conn.commit()
+        for key in victims:
+            try:
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+        logger.info(f"HTTP cache evicted {len(victims)} entries")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,120 @@
+import logging
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+logger = logging.getLogger(__name__)
+
+# Installed once per document. Records the last time nodes were added or
+# removed, and counts fetch/XHR requests still in flight. Attribute and text
+# changes and image/ad resource loads are ignored: carousels, tickers and ad
+# slots produce them forever, so the page would never count as quiet.
+_MONITOR_SCRIPT = """
+if (!window.__readiness) {
+    var state = window.__readiness = {last: performance.now(), pending: 0};
+    var touch = function() { state.last = performance.now(); };
+    new MutationObserver(touch).observe(document, {childList: true, subtree: true});
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function() {
+            state.pending++;
+            touch();
+            return originalFetch.apply(this, arguments).finally(function() {
+                state.pending--;
+                touch();
+            });
+        };
+    }
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        state.pending++;
+        touch();
+        this.addEventListener('loadend', function() {
+            state.pending--;
+            touch();
+        });
+        return originalSend.apply(this, arguments);
+    };
+}
+"""
+
+# Returns [readyState, ms since last activity, requests in flight, element count]
+_PROBE_SCRIPT = """
+var state = window.__readiness || {last: 0, pending: 0};
+var count = -1;
+if (arguments[0]) {
+    if (arguments[1] === 'xpath') {
+        count = document.evaluate(
+            'count(' + arguments[0] + ')', document, null, XPathResult.NUMBER_TYPE, null
+        ).numberValue;
+    } else {
+        count = document.querySelectorAll(arguments[0]).length;
+    }
+}
+return [document.readyState, performance.now() - state.last, state.pending, count];
+"""
+
+
+def wait_until_ready(driver, selector=None, by="css", min_count=0, timeout=10,
+                     quiet_period=0.5, poll_interval=0.1):
+    """Block until the page in ``driver`` has settled, or ``timeout`` seconds pass.
+
+    A page counts as settled once the document has finished loading, no
+    fetch/XHR request started after the monitor was installed is still
+    pending, and no nodes have been added to or removed from the DOM for
+    ``quiet_period`` seconds. With a ``selector`` (CSS, or XPath when
+    ``by="xpath"``) its match count must also be at least ``min_count`` and
+    unchanged for the same quiet period.
+
+    Returns True if the page settled and False if the timeout was hit; the
+    caller can carry on with whatever has rendered either way. Politeness
+    delays are the scheduler's job, not this function's.
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    quiet_ms = quiet_period * 1000
+    last_count = None
+    count_stable_since = start
+
+    try:
+        driver.execute_script(_MONITOR_SCRIPT)
+    except WebDriverException as e:
+        logger.debug(f"Could not install readiness monitor: {str(e)}")
+
+    while True:
+        now = time.monotonic()
+        try:
+            ready_state, idle_ms, pending, count = driver.execute_script(
+                _PROBE_SCRIPT, selector, by
+            )
+        except WebDriverException as e:
+            # Usually a navigation swapped the document; reinstall and keep polling
+            logger.debug(f"Readiness probe failed: {str(e)}")
+            ready_state, idle_ms, pending, count = "loading", 0, 0, None
+            try:
+                driver.execute_script(_MONITOR_SCRIPT)
+            except WebDriverException:
+                pass
+
+        if count != last_count:
+            last_count = count
+            count_stable_since = now
+
+        settled = (
+            ready_state == "complete"
+            and pending <= 0
+            and idle_ms >= quiet_ms
+            and (selector is None or (
+                count is not None
+                and count >= min_count
+                and now - count_stable_since >= quiet_period
+            ))
+        )
+        if settled:
+            logger.debug(f"Page ready after {now - start:.2f}s")
+            return True
+        if now >= deadline:
+            logger.debug(f"Page not settled after {timeout}s (state={ready_state}, "
+                         f"pending={pending}, count={count})")
+            return False
+        time.sleep(poll_interval)
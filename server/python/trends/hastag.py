@@ -2,21 +2,29 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import time
+import os
 import re
+import sys
 
-# Set up Chrome options
-options = webdriver.ChromeOptions()
-options.add_argument('--headless')  # Run in headless mode
-options.add_argument('--disable-gpu')  # Disable GPU acceleration
-options.add_argument('--no-sandbox')  # Bypass OS security model
-options.add_argument('--disable-dev-shm-usage')  # Overcome limited resource problems
-options.add_argument('--window-size=1920,1080')  # Set window size to simulate full screen
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from readiness import wait_until_ready
+from chrome_watchdog import ChromeWatchdog
 
-# Initialize WebDriver
-driver = webdriver.Chrome(options=options)
+ITEM_XPATH = '//*[@id="hashtagItemContainer"]'
 
-try:
+
+def set_up_driver():
+    # Set up Chrome options
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless')  # Run in headless mode
+    options.add_argument('--disable-gpu')  # Disable GPU acceleration
+    options.add_argument('--no-sandbox')  # Bypass OS security model
+    options.add_argument('--disable-dev-shm-usage')  # Overcome limited resource problems
+    options.add_argument('--window-size=1920,1080')  # Set window size to simulate full screen
+    return webdriver.Chrome(options=options)
+
+
+def print_trending_hashtags(driver):
     # Navigate to the target page
     driver.get('https://ads.tiktok.com/business/creativecenter/inspiration/popular/hashtag/pc/en')
 
@@ -29,19 +37,20 @@ try:
     # Find and click the button 5 times
     button = driver.find_element(By.XPATH, button_xpath)
     for i in range(5):
+        item_count = len(driver.find_elements(By.XPATH, ITEM_XPATH))
         driver.execute_script("arguments[0].scrollIntoView(true);", button)
-        time.sleep(1)  # Wait for scrolling to complete
         driver.execute_script("arguments[0].click();", button)
         print(f"Clicked the button {i + 1} time(s)")
-        time.sleep(2)  # Wait for new content to load
+        # Wait until the new items have rendered and the item count stops changing
+        wait_until_ready(driver, ITEM_XPATH, by="xpath", min_count=item_count + 1, timeout=10)
 
     # Wait for elements with the target XPath to be present
     WebDriverWait(driver, 10).until(
-        EC.presence_of_all_elements_located((By.XPATH, '//*[@id="hashtagItemContainer"]'))
+        EC.presence_of_all_elements_located((By.XPATH, ITEM_XPATH))
     )
 
     # Extract and filter text from each element matching the XPath
-    elements = driver.find_elements(By.XPATH, '//*[@id="hashtagItemContainer"]')
+    elements = driver.find_elements(By.XPATH, ITEM_XPATH)
     for element in elements:
         text = element.text.strip()
         # Split the text into lines and filter the desired ones
@@ -51,6 +60,10 @@ try:
             if line.startswith('#') or re.match(r'.*\d+K$', line):
                 print(line)
 
-finally:
-    # Quit the WebDriver
-    driver.quit()
+
+if __name__ == "__main__":
+    watchdog = ChromeWatchdog()
+    watchdog.reap_orphans()
+    # The session quits Chrome however the scrape ends
+    with watchdog.session(set_up_driver) as driver:
+        print_trending_hashtags(driver)